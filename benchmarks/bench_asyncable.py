@@ -0,0 +1,57 @@
+"""
+Micro-benchmark for calling safe_sync Asyncables.
+
+Compares the per-call cost of awaiting a safe_sync Asyncable against the
+previous strategy of wrapping the callable in a coroutine and scheduling
+it as a Task on the event loop.
+
+    $ python -m benchmarks.bench_asyncable
+"""
+import asyncio
+import time
+
+from hautomate.util.async_ import Asyncable, safe_sync
+
+
+N = 100_000
+
+
+@safe_sync
+def _dummy_fn(ctx):
+    return ctx
+
+
+def _task_per_call(func):
+    """
+    The previous implementation of Asyncable.__call__ for safe_sync.
+    """
+    def _call(*a, **kw):
+        async def _wrapped(func, *a, **kw):
+            return func(*a, **kw)
+
+        loop = asyncio.get_event_loop()
+        return loop.create_task(_wrapped(func, *a, **kw))
+
+    return _call
+
+
+async def _timeit(call) -> float:
+    beg = time.perf_counter()
+
+    for i in range(N):
+        await call(i)
+
+    return (time.perf_counter() - beg) / N
+
+
+async def main():
+    inline = await _timeit(Asyncable(_dummy_fn))
+    tasked = await _timeit(_task_per_call(_dummy_fn))
+
+    print(f'task per call: {tasked * 1e6 :>6.2f}us/call')
+    print(f'inline       : {inline * 1e6 :>6.2f}us/call')
+    print(f'saving       : {(tasked - inline) * 1e6 :>6.2f}us/call ({tasked / inline :.1f}x)')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,4 +1,4 @@
-from typing import Callable
+from typing import Callable, Iterable, Tuple, Dict
 import functools as ft
 import logging
 import inspect
@@ -82,6 +82,25 @@ class API:
         }
         return await self.hauto.bus.fire(**kwargs)
 
+    async def fire_many(self, events: Iterable[Tuple[str, Dict]], **kwargs) -> int:
+        """
+        Send a burst of messages over the event bus.
+
+        Parameters
+        ----------
+        events : Iterable[(str, dict)]
+            pairs of event name and event data
+
+        **kwargs
+            passed through to EventBus.fire_many
+
+        Returns
+        -------
+        fired : int
+            number of Intents which were run
+        """
+        return await self.hauto.bus.fire_many(events, parent=self.api_name, **kwargs)
+
 
 class APIRegistry:
     """
@@ -135,7 +154,8 @@ class public_method(Asyncable):
         if self.concurrency == 'safe_sync':
             injected = ft.partial(self.func, instance)
         else:
-            injected = ft.partial(self, instance, loop=instance.hauto.loop)
+            executor = instance.hauto.executors.get(instance.api_name)
+            injected = ft.partial(self, instance, loop=instance.hauto.loop, executor=executor)
 
         instance.__dict__[self.func.__name__] = injected
         return injected
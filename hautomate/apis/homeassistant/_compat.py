@@ -1,47 +1,164 @@
+from typing import Callable, Iterable, Optional, Tuple, Any, List
+from urllib.parse import urlsplit
 import asyncio
 import logging
-import json
 
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, State
 import websockets
 import httpx
 
+from hautomate.apis.homeassistant.codec import get_codec
+from hautomate.apis.homeassistant.cache import StateCache
+from hautomate.errors import HautoError
+
 
 _log = logging.getLogger(__name__)
 
 
+def _to_event(data: dict) -> Event:
+    """
+    Convert a websocket event payload into a Home Assistant Event.
+    """
+    event_data = data.get('data', {})
+
+    if data['event_type'] == EVENT_STATE_CHANGED:
+        event_data = {
+            **event_data,
+            'old_state': State.from_dict(event_data.get('old_state')),
+            'new_state': State.from_dict(event_data.get('new_state')),
+        }
+
+    return Event(data['event_type'], event_data)
+
+
 class HassWebConnector:
+    """
+    Connection to a remote Home Assistant, over its websocket API.
+
+    Upon connecting, the connector subscribes to Home Assistant's event
+    stream and takes a snapshot of all states. From then on, the local
+    StateCache is kept current by the stream of state_changed events, so
+    entities may be read without ever making a round trip.
+
+    Only the event types in <event_types> are subscribed to, along with
+    state_changed which the cache relies upon. By default, that's every
+    event type. State changes which weren't asked for only update the
+    cache, where they're kept as raw dicts until read.
+
+    Should the connection drop, it is re-established with exponential
+    backoff. Whatever changed while disconnected is found by comparing a
+    fresh snapshot with the cache, and delivered as state_changed events.
+
+    Parameters
+    ----------
+    loop : asyncio.AbstractEventLoop = None
+      event loop to run in
+
+    host : str = None
+      url or hostname of Home Assistant
+
+    port : int = None
+      port of Home Assistant's API
+
+    access_token : str = None
+      a long-lived access token
+
+    timeout : float = 10
+      seconds to wait for Home Assistant to answer a request
+
+    reconnect_delay : float = 1
+      seconds to wait before the first attempt to reconnect
+
+    max_reconnect_delay : float = 60
+      upper bound on the wait between attempts to reconnect
+
+    codec : str = None
+      one of 'orjson', 'ujson', or 'json', default is the fastest installed
 
+    max_connections : int = 10
+      size of the pool of HTTP connections to Home Assistant's REST API
+
+    retries : int = 3
+      attempts to make an HTTP request which failed to connect
+
+    max_message_size : int = 64 MiB
+      largest websocket message accepted, or None for no limit; the state
+      snapshot of a large install easily outgrows websockets' own 1 MiB
+    """
     def __init__(
         self,
         loop: asyncio.AbstractEventLoop=None,
         host: str=None,
         port: int=None,
         access_token: str=None,
+        timeout: float=10,
+        reconnect_delay: float=1,
+        max_reconnect_delay: float=60,
+        codec: str=None,
+        max_connections: int=10,
+        retries: int=3,
+        max_message_size: Optional[int]=64 * 2 ** 20,
     ):
-        headers = {
-            'Authorization': f'Bearer {access_token}',
-            'Content-Type': 'application/json'
-        }
         self.loop = loop
         self._host = host
         self._port = port
         self._access_token = access_token
+        self.timeout = timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._codec = get_codec(codec)
+        self.retries = retries
+        self.max_message_size = max_message_size
         self._ws = None
         self._ws_interaction_id = 0
         self._ws_responses = {}
-        self._http = httpx.AsyncClient(headers=headers)
+        self._ws_callbacks = {}
+        self.event_types = None
+        self._subscriptions = {}
+        self._subscriptions_lock = asyncio.Lock()
+        self._reader = None
+        self._supervisor = None
+        self._backlog = None
+        self._outbox = []
+        self._writer = None
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                'Authorization': f'Bearer {access_token}',
+                'Content-Type': 'application/json'
+            },
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+        )
+        self.states = StateCache()
+        self.on_events: Callable[[List[Event]], None] = None
+
+    @property
+    def _hostname(self) -> str:
+        host = str(self._host)
+        return urlsplit(host).hostname if '://' in host else host
+
+    @property
+    def _secure(self) -> bool:
+        return str(self._host).startswith('https://')
 
     @property
     def ws_uri(self) -> str:
         """
         """
-        return f'ws://{self._host}:{self._port}/api/websocket'
+        scheme = 'wss' if self._secure else 'ws'
+        return f'{scheme}://{self._hostname}:{self._port}/api/websocket'
 
     @property
     def base_url(self) -> str:
         """
         """
-        return f'http://{self._host}:{self._port}/api'
+        scheme = 'https' if self._secure else 'http'
+        return f'{scheme}://{self._hostname}:{self._port}/api'
 
     def _next_ws_interaction_id(self):
         """
@@ -60,20 +177,19 @@ class HassWebConnector:
         Further reading:
           /docs/external_api_websocket/#authentication-phase
         """
-        self._ws = await websockets.connect(self.ws_uri)
-        await self._ws_auth_flow()
+        self._ws = await websockets.connect(self.ws_uri, max_size=self.max_message_size)
 
         _log.info('authenticating with Home Assistant')
         msg = await self._ws.recv()
-        msg = json.loads(msg)
+        msg = self._codec.loads(msg)
 
         if msg['type'] == 'auth_required':
-            await self._ws.send(json.dumps({
+            await self._ws.send(self._codec.dumps({
                 'type': 'auth',
                 'access_token': self._access_token
             }))
             msg = await self._ws.recv()
-            msg = json.loads(msg)
+            msg = self._codec.loads(msg)
 
         if msg['type'] == 'auth_ok':
             _log.info('authenticated with Home Assistant')
@@ -82,37 +198,399 @@ class HassWebConnector:
             err = msg['message']
             raise ValueError(f'AUTHORIZATION INVALID: {err}')
 
-    async def call_service(
+    async def connect(self) -> None:
+        """
+        Authenticate, subscribe to events, and take a snapshot of all states.
+        """
+        await self._open()
+        self._supervisor = asyncio.create_task(self._supervise())
+
+    async def close(self) -> None:
+        """
+        Close the connection to Home Assistant.
+        """
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            self._supervisor = None
+
+        await self._disconnect()
+        await self._http.aclose()
+
+    async def _open(self, *, resync: bool=False) -> None:
+        """
+        Establish a connection, and bring the cache up to date.
+        """
+        # hold events back until the snapshot has been applied
+        if resync:
+            self._backlog = []
+
+        try:
+            await self._ws_auth_flow()
+            self._reader = asyncio.create_task(self._read())
+
+            # subscribe first, so that no change is lost while the snapshot loads
+            self._subscriptions.clear()
+            await self._sync_subscriptions()
+            states = await self._request({'type': 'get_states'})
+
+            if not resync:
+                self.states.bootstrap(states)
+                _log.info(f'loaded {len(self.states)} entities from Home Assistant')
+                return
+
+            changes = self.states.resync(states)
+            _log.info(f'resynced {len(changes)} entities which changed while disconnected')
+            events = []
+
+            if self._wants(EVENT_STATE_CHANGED):
+                events.extend(
+                    Event(EVENT_STATE_CHANGED, {'entity_id': e, 'old_state': old, 'new_state': new})
+                    for e, old, new in changes
+                )
+
+            for data in self._backlog:
+                event = self._accept(data, stale_ok=False)
+
+                if event is not None:
+                    events.append(event)
+
+            if events and self.on_events is not None:
+                self.on_events(events)
+        except Exception:
+            await self._disconnect()
+            raise
+        finally:
+            self._backlog = None
+
+    async def _disconnect(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+
+    async def _supervise(self) -> None:
+        """
+        Re-establish the connection whenever it drops.
+        """
+        while True:
+            await asyncio.wait({self._reader})
+            await self._disconnect()
+            delay = self.reconnect_delay
+
+            while True:
+                _log.info(f'reconnecting to Home Assistant in {delay:.1f}s')
+                await asyncio.sleep(delay)
+
+                try:
+                    await self._open(resync=True)
+                except ValueError:
+                    _log.error('Home Assistant rejected our access token, giving up')
+                    return
+                except (OSError, asyncio.TimeoutError, websockets.WebSocketException, HautoError) as e:
+                    _log.warning(f'failed to reconnect to Home Assistant: {e!r}')
+                    delay = min(delay * 2, self.max_reconnect_delay)
+                else:
+                    break
+
+    async def set_event_types(self, event_types: Optional[Iterable[str]]) -> None:
+        """
+        Change which event types Home Assistant sends us.
+
+        Parameters
+        ----------
+        event_types : Iterable[str]
+          event types to receive, or None for all of them
+        """
+        self.event_types = None if event_types is None else set(event_types)
+
+        if self._ws is None or not self._ws.open:
+            return
+
+        try:
+            await self._sync_subscriptions()
+        except (HautoError, asyncio.TimeoutError) as e:
+            # on reconnect, subscriptions are made from scratch anyway
+            _log.warning(f'failed to update event subscriptions: {e!r}')
+
+    async def _sync_subscriptions(self) -> None:
+        """
+        Subscribe to, and unsubscribe from, event types until we get
+        exactly the ones wanted.
+
+        New subscriptions are made before old ones are dropped. Every event
+        is then accepted from exactly one subscription, its owner, which is
+        the one for its event type if we have it, otherwise the one for all
+        events. Ownership moves only when Home Assistant's answer is read,
+        so no event is missed or delivered twice in the meantime.
+        """
+        async with self._subscriptions_lock:
+            if self.event_types is None:
+                wanted = {None}
+            else:
+                wanted = {EVENT_STATE_CHANGED, *self.event_types}
+
+            current = set(self._subscriptions)
+            subscribe = [self._subscribe(event_type) for event_type in wanted - current]
+            unsubscribe = [self._unsubscribe(event_type) for event_type in current - wanted]
+
+            if subscribe:
+                await asyncio.gather(*subscribe)
+
+            if unsubscribe:
+                await asyncio.gather(*unsubscribe)
+
+            _log.debug(f'subscribed to {sorted(self._subscriptions, key=str)}')
+
+    async def _subscribe(self, event_type: Optional[str]) -> None:
+        def _owned(msg):
+            self._subscriptions[event_type] = msg['id']
+
+        payload = {'type': 'subscribe_events'}
+
+        if event_type is not None:
+            payload['event_type'] = event_type
+
+        await self._request(payload, on_result=_owned)
+
+    async def _unsubscribe(self, event_type: Optional[str]) -> None:
+        def _disowned(msg):
+            self._subscriptions.pop(event_type, None)
+
+        payload = {'type': 'unsubscribe_events', 'subscription': self._subscriptions[event_type]}
+        await self._request(payload, on_result=_disowned)
+
+    async def _read(self) -> None:
+        """
+        Receive all messages from Home Assistant.
+
+        This is the only consumer of the websocket. Results are matched to
+        their request by interaction id, so any number of requests may be
+        in flight at once, and answered in any order.
+        """
+        try:
+            async for raw in self._ws:
+                self._on_message(self._codec.loads(raw))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for fut in self._ws_responses.values():
+                if not fut.done():
+                    fut.set_exception(HautoError('lost connection to Home Assistant'))
+
+            self._ws_responses.clear()
+            self._ws_callbacks.clear()
+
+        _log.warning('lost connection to Home Assistant')
+
+    def _on_message(self, msg: dict) -> None:
+        if msg['type'] == 'event':
+            event_type = msg['event']['event_type']
+            owner = self._subscriptions.get(event_type, self._subscriptions.get(None))
+
+            if owner == msg['id']:
+                self._on_event(msg['event'])
+
+            return
+
+        if msg['type'] == 'result':
+            fut = self._ws_responses.pop(msg['id'], None)
+            callback = self._ws_callbacks.pop(msg['id'], None)
+
+            if fut is None or fut.done():
+                return
+
+            if msg['success']:
+                if callback is not None:
+                    callback(msg)
+
+                fut.set_result(msg.get('result'))
+            else:
+                error = msg.get('error', {})
+                fut.set_exception(HautoError(f"{error.get('code')}: {error.get('message')}"))
+
+    def _on_event(self, data: dict) -> None:
+        if self._backlog is not None:
+            self._backlog.append(data)
+            return
+
+        event = self._accept(data)
+
+        if event is not None and self.on_events is not None:
+            self.on_events([event])
+
+    def _wants(self, event_type: str) -> bool:
+        return self.event_types is None or event_type in self.event_types
+
+    def _accept(self, data: dict, *, stale_ok: bool=True) -> Optional[Event]:
+        """
+        Apply an event to the cache, and build it if anybody wants it.
+
+        Unwanted state changes go into the cache as they arrived, and are
+        only parsed if the entity is read.
+        """
+        if data['event_type'] != EVENT_STATE_CHANGED:
+            return _to_event(data)
+
+        if not self._wants(EVENT_STATE_CHANGED):
+            self.states.apply(data['data'], stale_ok=stale_ok)
+            return None
+
+        event = _to_event(data)
+
+        if not self.states.apply(event.data, stale_ok=stale_ok) and not stale_ok:
+            return None
+
+        return event
+
+    def _send(self, frame: str) -> None:
+        """
+        Queue a frame to be written to the websocket.
+
+        Frames queued within the same iteration of the event loop are
+        written back-to-back by a single writer, in order. Requests never
+        wait on the socket, or on each other, to be sent.
+        """
+        self._outbox.append(frame)
+
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write())
+
+    async def _write(self) -> None:
+        ws = self._ws
+
+        try:
+            while self._outbox:
+                frames, self._outbox = self._outbox, []
+
+                for frame in frames:
+                    await ws.send(frame)
+        except websockets.ConnectionClosed:
+            # the reader fails whichever requests are waiting on these
+            self._outbox.clear()
+        finally:
+            self._writer = None
+
+    async def _request(
         self,
-        domain,
-        service,
-        service_data,
-        # blocking=False,
-        # limit=10
-    ):
+        payload: dict,
+        *,
+        timeout: float=None,
+        on_result: Callable[[dict], None]=None
+    ) -> Any:
+        """
+        Send a command to Home Assistant, and wait for its result.
+
+        Raises HautoError if Home Assistant rejects the command or the
+        connection is lost, and asyncio.TimeoutError if no result arrives
+        in time.
+
+        Parameters
+        ----------
+        payload : dict
+          the command to send, less its interaction id
+
+        timeout : float = None
+          seconds to wait for a result, default is the connector's timeout
+
+        on_result : Callable[[dict], None] = None
+          called with a successful result message, as soon as it's read
+
+        Returns
+        -------
+        result : Any
+          the result of the command
+        """
+        if self._ws is None or not self._ws.open:
+            raise HautoError('not connected to Home Assistant')
+
         interaction_id = self._next_ws_interaction_id()
+        loop = self.loop or asyncio.get_event_loop()
+        self._ws_responses[interaction_id] = fut = loop.create_future()
 
-        await self._ws.send(json.dumps({
-            'id': interaction_id,
-            'type': 'call_service',
-            'domain': domain,
-            'service': service,
-            'service_data': service_data
-        }))
+        if on_result is not None:
+            self._ws_callbacks[interaction_id] = on_result
 
-        # if not blocking:
-        #     return None
+        try:
+            self._send(self._codec.dumps({'id': interaction_id, **payload}))
+            return await asyncio.wait_for(fut, timeout or self.timeout)
+        finally:
+            # a late result for an abandoned request is simply dropped
+            self._ws_responses.pop(interaction_id, None)
+            self._ws_callbacks.pop(interaction_id, None)
 
-        # self._ws_responses[interaction_id] = fut = self.loop.create_future()
+    async def call_service(
+        self,
+        domain: str,
+        service: str,
+        service_data: dict=None,
+        *,
+        timeout: float=None
+    ) -> dict:
+        """
+        Call a service, and wait for Home Assistant to confirm it.
 
-        # try:
-        #     await asyncio.wait({fut}, timeout=limit)
-        # except asyncio.TimeoutError:
-        #     r = False
+        Further reading:
+          /docs/api/websocket/#calling-a-service
+        """
+        payload = {'type': 'call_service', 'domain': domain, 'service': service}
 
-        # return r
+        if service_data:
+            payload['service_data'] = service_data
 
-    async def fire_event(self, event_type, event_data):
+        return await self._request(payload, timeout=timeout)
+
+    async def call_services(self, calls: Iterable[Tuple[str, str, dict]]) -> List[Any]:
+        """
+        Call many services at once.
+
+        All calls are pipelined over the websocket, so a burst costs about
+        one round trip rather than one per call.
+
+        Parameters
+        ----------
+        calls : Iterable[(str, str, dict)]
+          triples of domain, service, and service_data
+
+        Returns
+        -------
+        results : List[Any]
+          the result of each call, or the exception it raised
+        """
+        coros = [self.call_service(domain, service, data) for domain, service, data in calls]
+        return await asyncio.gather(*coros, return_exceptions=True)
+
+    async def _post(self, path: str, data: Any=None) -> httpx.Response:
+        """
+        POST to Home Assistant's REST API.
+
+        Requests which never reached Home Assistant are retried with
+        backoff. Anything else may have had an effect, and is not.
+        """
+        delay = 0.1
+
+        attempts = max(self.retries, 1)
+
+        for attempt in range(attempts):
+            try:
+                r = await self._http.post(path, data=self._codec.dumps(data or {}))
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                if attempt == attempts - 1:
+                    raise
+
+                await asyncio.sleep(delay)
+                delay *= 2
+            else:
+                r.raise_for_status()
+                return r
+
+    async def fire_event(self, event_type: str, event_data: dict=None) -> None:
         """
+        Fire an event in Home Assistant.
+
+        Further reading:
+          /docs/api/rest/#post-apieventsltevent_type
         """
-        await self._http.post(f'/api/events/{event_type}', json=event_data)
+        await self._post(f'/events/{event_type}', event_data)
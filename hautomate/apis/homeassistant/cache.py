@@ -0,0 +1,149 @@
+from typing import Iterable, Optional, Union, Tuple, List
+import collections
+
+from homeassistant.core import State
+
+
+def _entity_id(state: Union[State, dict]) -> str:
+    return state['entity_id'] if isinstance(state, dict) else state.entity_id
+
+
+def _last_updated(state: Union[State, dict]) -> str:
+    # Home Assistant serializes with isoformat, in UTC, so these sort by time
+    return state['last_updated'] if isinstance(state, dict) else state.last_updated.isoformat()
+
+
+class StateCache:
+    """
+    A local copy of Home Assistant's state machine.
+
+    Entities are indexed both by entity_id, and by domain, so that single
+    lookups and domain-wide scans never leave the process.
+
+    States may be given as Home Assistant States, or as the raw dicts of
+    the websocket API. Raw states are only parsed into a State once they
+    are read, so a large snapshot costs little more than its decoding.
+    """
+    def __init__(self):
+        self._states = {}
+        self._by_domain = collections.defaultdict(dict)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self._states
+
+    @property
+    def entity_ids(self) -> List[str]:
+        """
+        Return all known entity_ids.
+        """
+        return list(self._states)
+
+    def get(self, entity_id: str) -> Optional[State]:
+        """
+        Retrieve state of entity_id or None if not found.
+        """
+        state = self._states.get(entity_id)
+
+        if isinstance(state, dict):
+            self._states[entity_id] = state = State.from_dict(state)
+
+        return state
+
+    def all(self, domain: str=None) -> List[State]:
+        """
+        Retrieve all states, optionally only those within <domain>.
+        """
+        entity_ids = self._states if domain is None else self._by_domain.get(domain, ())
+        return [self.get(entity_id) for entity_id in list(entity_ids)]
+
+    def set(self, state: Union[State, dict]) -> None:
+        """
+        Record the current state of an entity.
+        """
+        entity_id = _entity_id(state)
+        domain, _, _ = entity_id.partition('.')
+        self._states[entity_id] = state
+        self._by_domain[domain][entity_id] = None
+
+    def remove(self, entity_id: str) -> Optional[State]:
+        """
+        Forget an entity, returning its last known state.
+        """
+        state = self.get(entity_id)
+
+        if state is not None:
+            del self._states[entity_id]
+            domain = self._by_domain[state.domain]
+            domain.pop(entity_id, None)
+
+            if not domain:
+                del self._by_domain[state.domain]
+
+        return state
+
+    def apply(self, event_data: dict, *, stale_ok: bool=True) -> bool:
+        """
+        Update the cache from the data of a state_changed event.
+
+        Unless <stale_ok>, states older than those already known are
+        ignored. Returns whether or not the cache changed.
+        """
+        new = event_data['new_state']
+
+        if new is None:
+            return self.remove(event_data['entity_id']) is not None
+
+        known = self._states.get(_entity_id(new))
+
+        if not stale_ok and known is not None and _last_updated(known) >= _last_updated(new):
+            return False
+
+        self.set(new)
+        return True
+
+    def bootstrap(self, states: Iterable[Union[State, dict]]) -> None:
+        """
+        Load a full snapshot of states.
+
+        Entities which have changed since the snapshot was taken keep
+        their more recent state.
+        """
+        for state in states:
+            known = self._states.get(_entity_id(state))
+
+            if known is None or _last_updated(known) <= _last_updated(state):
+                self.set(state)
+
+    def resync(
+        self,
+        states: Iterable[Union[State, dict]]
+    ) -> List[Tuple[str, Optional[State], Optional[State]]]:
+        """
+        Replace the cache with a full snapshot of states.
+
+        Returns the differences as (entity_id, old_state, new_state), where
+        old_state is None for new entities and new_state is None for those
+        which no longer exist.
+        """
+        changes = []
+        seen = set()
+
+        for state in states:
+            entity_id = _entity_id(state)
+            seen.add(entity_id)
+            known = self._states.get(entity_id)
+
+            if known is not None and _last_updated(known) == _last_updated(state):
+                continue
+
+            old = self.get(entity_id)
+            self.set(state)
+            changes.append((entity_id, old, self.get(entity_id)))
+
+        for entity_id in [e for e in self._states if e not in seen]:
+            changes.append((entity_id, self.remove(entity_id), None))
+
+        return changes
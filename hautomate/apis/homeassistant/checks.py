@@ -1,5 +1,8 @@
+from typing import Optional
+
 from homeassistant.core import split_entity_id, valid_entity_id
 
+from hautomate.apis.homeassistant.view import StateView, views
 from hautomate.context import Context
 from hautomate.check import Check
 
@@ -59,27 +62,46 @@ class DiscreteValueCheck(Check):
         super().__init__(concurrency='safe_sync')
 
     def __check__(self, ctx: Context) -> bool:
-        old = ctx.event_data['old_entity']
-        new = ctx.event_data['new_entity']
-
-        if self.attribute is not None:
-            old_value = old['attributes'].get(self.attribute, 'SENTINEL_NULL')
-            new_value = new['attributes'].get(self.attribute, 'SENTINEL_NULL')
-        else:
-            old_value = old.state
-            new_value = new.state
+        return self.matches(*views(ctx.event_data))
 
-        if self.from_ is not None and self.from_ != old_value:
+    def matches(self, old: Optional[StateView], new: Optional[StateView]) -> bool:
+        """
+        Determine if the change from <old> to <new> is wanted.
+        """
+        if new is None:
             return False
 
-        if self.to_ is not None and self.to_ != new_value:
+        if self.from_ is not None and (old is None or self.from_ != old.value(self.attribute)):
             return False
 
-        return True
+        return self.holds(new)
+
+    def holds(self, entity: StateView) -> bool:
+        """
+        Determine if <entity> is still where it's wanted.
+        """
+        return self.to_ is None or self.to_ == entity.value(self.attribute)
 
 
 class ContinuousValueCheck(Check):
     """
+    Check if an entity's numeric value lies within a range.
+
+    Values which aren't numbers, such as 'unavailable', never match.
+
+    Attributes
+    ----------
+    above : float, default None
+      value must be greater than this
+
+    below : float, default None
+      value must be less than this
+
+    inclusive : bool, default False
+      whether or not the bounds themselves match
+
+    attribute : str, default None
+      attribute to check, rather than the state
     """
     def __init__(
         self,
@@ -89,33 +111,43 @@ class ContinuousValueCheck(Check):
         inclusive: bool=False,
         attribute: str=None
     ):
-        if not any((above, below)):
+        if above is None and below is None:
             raise TypeError("ContinuousStateCheck missing 1 required argument 'above' or 'below'")
 
-        self.above = above
-        self.below = below
+        self.above = None if above is None else float(above)
+        self.below = None if below is None else float(below)
         self.inclusive = inclusive
         self.attribute = attribute
         super().__init__(concurrency='safe_sync')
 
     def __check__(self, ctx: Context) -> bool:
-        entity = ctx.event_data['new_entity']
-
-        if self.attribute is not None:
-            value = entity['attributes'].get(self.attribute, 'SENTINEL_NULL')
-        else:
-            value = entity.state
+        return self.matches(*views(ctx.event_data))
+
+    def matches(self, old: Optional[StateView], new: Optional[StateView]) -> bool:
+        """
+        Determine if the change from <old> to <new> is wanted.
+        """
+        return new is not None and self.holds(new)
+
+    def holds(self, entity: StateView) -> bool:
+        """
+        Determine if <entity> is still where it's wanted.
+        """
+        return self.contains(entity.number(self.attribute))
+
+    def contains(self, value: Optional[float]) -> bool:
+        """
+        Determine if <value> lies within the range.
+        """
+        if value is None:
+            return False
 
         if self.above is not None:
-            if self.inclusive and value >= self.above:
-                return False
-            elif value > self.above:
+            if value < self.above or (value == self.above and not self.inclusive):
                 return False
 
         if self.below is not None:
-            if self.inclusive and value <= self.below:
-                return False
-            elif value < self.below:
+            if value > self.below or (value == self.below and not self.inclusive):
                 return False
 
         return True
@@ -0,0 +1,63 @@
+from typing import Callable, Hashable
+
+from hautomate.util.timers import KeyedTimers
+
+
+# state before a burst is kept, everything else is the latest
+_OLD_KEYS = ('old_entity', 'old_state', 'old_view')
+
+
+class StateCoalescer:
+    """
+    Collapse bursts of entity events into a single delivery.
+
+    A burst begins with the first event for a key and lasts <window>
+    seconds. When it ends, a single event is flushed which carries the
+    entity's state from before the burst, its latest state, and the
+    number of events which were coalesced.
+
+    Parameters
+    ----------
+    flush : Callable[[key, event, event_data], None]
+      called with the merged event at the end of every burst
+
+    call_later : Callable = None
+      scheduler with the signature of loop.call_later
+    """
+    def __init__(self, flush: Callable, *, call_later: Callable=None):
+        self._flush = flush
+        self._timers = KeyedTimers(call_later)
+        self._pending = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def push(self, key: Hashable, window: float, event: str, event_data: dict) -> None:
+        """
+        Add an event to the burst for <key>, starting one if necessary.
+        """
+        try:
+            pending = self._pending[key]
+        except KeyError:
+            self._pending[key] = [event, dict(event_data), 1]
+            self._timers.start(key, window, self._close, key)
+            return
+
+        merged = pending[1]
+        before = {k: merged[k] for k in _OLD_KEYS if k in merged}
+        merged.update(event_data)
+        merged.update(before)
+        pending[0] = event
+        pending[2] += 1
+
+    def _close(self, key: Hashable) -> None:
+        event, event_data, count = self._pending.pop(key)
+        event_data['coalesced'] = count
+        self._flush(key, event, event_data)
+
+    def cancel_all(self) -> None:
+        """
+        Drop all bursts in progress.
+        """
+        self._timers.cancel_all()
+        self._pending.clear()
@@ -0,0 +1,63 @@
+from typing import Callable, NamedTuple, Any
+import functools as ft
+import importlib
+
+
+class Codec(NamedTuple):
+    """
+    A pair of functions to encode and decode websocket frames.
+
+    Home Assistant only accepts text frames, so dumps must return str.
+    """
+    name: str
+    loads: Callable[[str], Any]
+    dumps: Callable[[Any], str]
+
+
+def _orjson(orjson) -> Codec:
+    return Codec('orjson', orjson.loads, lambda obj: orjson.dumps(obj).decode())
+
+
+def _ujson(ujson) -> Codec:
+    return Codec('ujson', ujson.loads, ujson.dumps)
+
+
+def _json(json) -> Codec:
+    return Codec('json', json.loads, ft.partial(json.dumps, separators=(',', ':')))
+
+
+# fastest first
+_CODECS = {
+    'orjson': _orjson,
+    'ujson': _ujson,
+    'json': _json,
+}
+
+
+def get_codec(name: str=None) -> Codec:
+    """
+    Find a JSON codec.
+
+    Parameters
+    ----------
+    name : str = None
+      one of 'orjson', 'ujson', or 'json', default is the fastest installed
+
+    Returns
+    -------
+    codec : Codec
+    """
+    if name is not None and name not in _CODECS:
+        raise ValueError(f"codec must be one of {list(_CODECS)}, got '{name}'")
+
+    # stdlib json is last in line, and always importable
+    for candidate in ([name] if name is not None else _CODECS):
+        try:
+            module = importlib.import_module(candidate)
+        except ImportError:
+            if name is not None:
+                raise
+
+            continue
+
+        return _CODECS[candidate](module)
@@ -1,36 +1,86 @@
-from typing import Union, Callable
+from typing import Optional, Union, Callable, Iterable, Iterator, Tuple, List, Dict, Set, Any
+import collections
+import datetime as dt
 import asyncio
 import logging
+import weakref
 
 from homeassistant.const import EVENT_STATE_CHANGED
-from homeassistant.core import HomeAssistant as HASS, State, split_entity_id
+from homeassistant.core import (
+    HomeAssistant as HASS, Event as HassEvent, State, split_entity_id, valid_entity_id
+)
 
 from hautomate.util.async_ import safe_sync
+from hautomate.util.timers import KeyedTimers
 from hautomate.apis.homeassistant._compat import HassWebConnector
-from hautomate.apis.homeassistant.checks import (
-    EntityCheck, DiscreteValueCheck, ContinuousValueCheck
-)
+from hautomate.apis.homeassistant.coalesce import StateCoalescer
+from hautomate.apis.homeassistant.routing import Monitor, MonitorIndex, ThresholdIndex
+from hautomate.apis.homeassistant.checks import DiscreteValueCheck, ContinuousValueCheck
+from hautomate.apis.homeassistant.view import StateView, views
 from hautomate.apis.homeassistant.events import (
     HASS_STATE_CHANGED, HASS_ENTITY_CREATE, HASS_ENTITY_REMOVE, HASS_ENTITY_UPDATE,
-    HASS_ENTITY_CHANGE
+    HASS_ENTITY_CHANGE, HASS_ENTITY_MONITOR
 )
 from hautomate.apis.homeassistant.enums import HassFeed
+from hautomate.apis.moment.events import EVT_TIME_UPDATE, EVT_TIME_SLIPPAGE, EVT_TIME_SCHEDULED
+from hautomate.events import (
+    _META_EVENTS, _EVT_INIT, EVT_START, EVT_READY, EVT_STOP, EVT_CLOSE, EVT_ANY
+)
 from hautomate.context import Context
 from hautomate.intent import Intent
 from hautomate.api import API, api_method, public_method
 
 
 _log = logging.getLogger(__name__)
+# events which only ever happen inside Hautomate, never in Home Assistant
+_HAUTO_EVENTS = {
+    *_META_EVENTS, _EVT_INIT, EVT_START, EVT_READY, EVT_STOP, EVT_CLOSE, EVT_ANY,
+    EVT_TIME_UPDATE, EVT_TIME_SLIPPAGE, EVT_TIME_SCHEDULED
+}
+_STATE_EVENTS = {
+    HASS_STATE_CHANGED, HASS_ENTITY_CREATE, HASS_ENTITY_REMOVE, HASS_ENTITY_UPDATE,
+    HASS_ENTITY_CHANGE, HASS_ENTITY_MONITOR
+}
+
+
+def _log_failed_call(task: asyncio.Task) -> None:
+    """
+    Report a service call which failed while nobody was waiting on it.
+    """
+    if not task.cancelled() and task.exception() is not None:
+        _log.error(f'service call failed: {task.exception()!r}')
+
+
+def _log_failed_calls(task: asyncio.Task) -> None:
+    """
+    Report each service call of a batch which failed while nobody was waiting on it.
+    """
+    if task.cancelled():
+        return
+
+    if task.exception() is not None:
+        _log_failed_call(task)
+        return
+
+    for result in task.result():
+        if isinstance(result, Exception):
+            _log.error(f'service call failed: {result!r}')
 
 
 class HassInterface:
 
-    def __init__(self, feed: HassFeed, hass: Union[HASS, HassWebConnector]):
+    def __init__(
+        self,
+        feed: HassFeed,
+        hass: Union[HASS, HassWebConnector],
+        *,
+        on_events: Callable[[List[HassEvent]], None]=None
+    ):
         self.feed = feed
         self._hass = hass
 
         if not self.am_component:
-            asyncio.create_task(self._hass.ws_auth_flow())
+            self._hass.on_events = on_events
 
     @property
     def am_component(self) -> bool:
@@ -39,19 +89,46 @@ class HassInterface:
         """
         return self.feed == HassFeed.custom_component
 
+    async def start(self) -> None:
+        """
+        Connect to Home Assistant, if necessary.
+        """
+        if not self.am_component:
+            await self._hass.connect()
+
+    async def stop(self) -> None:
+        """
+        Disconnect from Home Assistant, if necessary.
+        """
+        if not self.am_component:
+            await self._hass.close()
+
+    async def set_event_types(self, event_types: Optional[Set[str]]) -> None:
+        """
+        Narrow the events sent by Home Assistant, if possible.
+
+        The custom component feed forwards events itself, so there is
+        nothing to narrow.
+        """
+        if not self.am_component:
+            await self._hass.set_event_types(event_types)
+
     #
 
     def get_entity(self, entity_id: str) -> State:
         """
-        TODO
+        Retrieve state of entity_id or None if not found.
+        """
+        return self._hass.states.get(entity_id)
+
+    def get_entities(self, domain: str=None) -> List[State]:
+        """
+        Retrieve all states, optionally only those within <domain>.
         """
         if self.am_component:
-            return self._hass.states.get(entity_id)
+            return self._hass.states.async_all(domain)
 
-        raise NotImplementedError(
-            'recording a copy of all states has not yet been registered for '
-            'the websocket implementation'
-        )
+        return self._hass.states.all(domain)
 
     async def create_helper(self, helper, ephemeral: bool=True):
         """
@@ -79,17 +156,42 @@ class HassInterface:
         self,
         domain: str,
         service: str,
-        service_data: dict
-    ) -> Union[bool, None]:
+        service_data: dict,
+        *,
+        wait: bool=False
+    ) -> Union[bool, dict, None]:
         """
-        TODO
+        Call a service in Home Assistant.
+
+        If <wait> is set, the call completes only once Home Assistant has
+        executed the service.
         """
         if self.am_component:
-            fn = self._hass.services.async_call
-        else:
-            fn = self._hass.call_service
+            return await self._hass.services.async_call(domain, service, service_data, blocking=wait)
 
-        return await fn(domain, service, service_data)  # , blocking=False, limit=10)
+        return await self._hass.call_service(domain, service, service_data)
+
+    async def call_services(
+        self,
+        calls: Iterable[Tuple[str, str, dict]],
+        *,
+        wait: bool=False
+    ) -> List[Any]:
+        """
+        Call many services in Home Assistant at once.
+
+        Over the websocket, all calls are pipelined, so that a burst costs
+        about one round trip. Returns the result of each call, or the
+        exception it raised.
+        """
+        if self.am_component:
+            coros = [
+                self._hass.services.async_call(domain, service, data, blocking=wait)
+                for domain, service, data in calls
+            ]
+            return await asyncio.gather(*coros, return_exceptions=True)
+
+        return await self._hass.call_services(calls)
 
     async def fire_event(self, event_type: str, event_data: dict) -> None:
         """
@@ -111,66 +213,304 @@ class HomeAssistant(API):
         *,
         feed: str,
         hass_interface: HASS=None,
+        coalesce: float=None,
         **hass_interface_kw
     ):
         if hass_interface is None:
             hass_interface = HassWebConnector(loop=hauto.loop, **hass_interface_kw)
 
         self.feed = feed
-        self.hass_interface = HassInterface(feed, hass_interface)
+        self.hass_interface = HassInterface(feed, hass_interface, on_events=self._on_remote_events)
+        self.coalesce = coalesce
+        self._coalescer = StateCoalescer(self._flush_coalesced, call_later=self._call_later)
+        self._monitors = MonitorIndex()
+        self._thresholds = ThresholdIndex()
+        self._holds = KeyedTimers(self._call_later)
+        self._unrouted = weakref.WeakKeyDictionary()
+        self._event_types_stale = False
         super().__init__(hauto)
 
     # Listeners and Internal Methods
 
+    async def on_start(self, ctx: Context):
+        """
+        Called once Hautomate begins to start up.
+        """
+        await self.hass_interface.set_event_types(self._wanted_event_types())
+        await self.hass_interface.start()
+
+    async def on_close(self, ctx: Context):
+        """
+        Called once Hautomate begins to shut down.
+        """
+        self._coalescer.cancel_all()
+        self._holds.cancel_all()
+        await self.hass_interface.stop()
+
+    def _on_remote_events(self, hass_events: List[HassEvent]) -> None:
+        """
+        Called when the websocket feed receives events.
+        """
+        asyncio.create_task(self._ingest(hass_events))
+
+    async def _ingest(self, hass_events: Iterable[HassEvent]) -> None:
+        """
+        Translate Home Assistant events and put them on the bus.
+        """
+        events = (e for event in hass_events for e in self._translate(event))
+        await self.fire_many(self._route(events))
+
+    @safe_sync
+    def on_intent_subscribe(self, ctx: Context):
+        """
+        Called when any Intent is subscribed to the event bus.
+
+        Monitors are added to the API's routing index, rather than
+        receiving every entity event through the bus.
+        """
+        intent = ctx.event_data['created_intent']
+        self._event_types_changed()
+
+        try:
+            event, entity_id, domain, coalesce, duration, conditions = self._unrouted.pop(intent)
+        except KeyError:
+            return
+
+        if duration is None and conditions and coalesce is None:
+            self._thresholds.add(event, Monitor(intent, entity_id, domain, None, None, conditions))
+            return
+
+        # a coalesced range is only checked against the end of each burst
+        if duration is None:
+            self._monitors.add(event, Monitor(intent, entity_id, domain, coalesce, None, conditions))
+            return
+
+        # any change may break a hold, so these watch them all
+        monitor = Monitor(intent, entity_id, domain, None, duration, conditions, event)
+        self._monitors.add(HASS_STATE_CHANGED, monitor)
+
+    @safe_sync
+    def on_intent_unsubscribe(self, ctx: Context):
+        """
+        Called when any Intent is removed from the event bus.
+        """
+        self._thresholds.discard(ctx.event_data['removed_intent'])
+        self._event_types_changed()
+
+    def _wanted_event_types(self) -> Optional[Set[str]]:
+        """
+        Determine which Home Assistant event types have listeners.
+        """
+        names = self.hauto.bus.subscribed()
+
+        if names is None:
+            return None
+
+        event_types = {
+            name.lower() for name in names
+            if name not in _HAUTO_EVENTS and not name.startswith('HASS_')
+        }
+
+        if names & _STATE_EVENTS:
+            event_types.add(EVENT_STATE_CHANGED)
+
+        return event_types
+
+    def _event_types_changed(self) -> None:
+        """
+        Update our event subscriptions in Home Assistant, soon.
+
+        Intents tend to come and go in bursts, so changes are batched up
+        until the end of the current loop iteration.
+        """
+        if self._event_types_stale:
+            return
+
+        self._event_types_stale = True
+        self.hauto.loop.call_soon(self._update_event_types)
+
+    def _update_event_types(self) -> None:
+        self._event_types_stale = False
+        event_types = self._wanted_event_types()
+        asyncio.create_task(self.hass_interface.set_event_types(event_types))
+
+    def _call_later(self, delay: float, callback: Callable, *a):
+        return self.hauto.apis.moment.call_later(delay, callback, *a)
+
+    def _route(self, events: Iterable[Tuple[str, dict]]) -> Iterator[Tuple[str, dict]]:
+        """
+        Deliver events to their Monitors, and yield them for the bus.
+
+        Events which are configured to coalesce are held back, and only
+        delivered once their burst ends.
+        """
+        for event, event_data in events:
+            if self.coalesce and event in (HASS_ENTITY_CHANGE, HASS_ENTITY_UPDATE):
+                key = (event, event_data['entity_id'])
+                self._coalescer.push(key, self.coalesce, event, event_data)
+                continue
+
+            self._to_monitors(event, event_data)
+            yield event, event_data
+
+    def _to_monitors(self, event: str, event_data: dict) -> None:
+        """
+        Deliver an event to the Monitors which watch its entity.
+        """
+        try:
+            entity_id = event_data['entity_id']
+        except KeyError:
+            return
+
+        direct = []
+
+        monitors = self._monitors.match(event, entity_id)
+        thresholds = self._thresholds.match(event, entity_id, event_data)
+
+        for monitor in (*monitors, *thresholds):
+            if monitor.duration is not None:
+                self._hold(monitor, event_data)
+            elif monitor.coalesce is None:
+                direct.append(monitor.intent)
+            else:
+                key = (monitor, entity_id)
+                self._coalescer.push(key, monitor.coalesce, event, event_data)
+
+        if direct:
+            self.hauto.bus.dispatch(event, direct, parent=self.api_name, **event_data)
+
+    def _hold(self, monitor: Monitor, event_data: dict) -> None:
+        """
+        Track how long a Monitor's conditions have held for an entity.
+
+        A change which meets the conditions starts a timer, and a change
+        which breaks them cancels it. Only if the timer runs out is the
+        change which started it delivered. Holding costs a single timer
+        handle, no matter how chatty the entity is.
+        """
+        entity_id = event_data['entity_id']
+        old, new = views(event_data)
+        key = (monitor.intent, entity_id)
+        change = self._classify_state_change(event_data)
+        relevant = change is not None and monitor.event in (HASS_STATE_CHANGED, change[0])
+
+        if key in self._holds:
+            if monitor.conditions:
+                held = new is not None and all(c.holds(new) for c in monitor.conditions)
+            else:
+                # without conditions, a hold lasts until the next change of its kind
+                held = not relevant
+
+            if held:
+                return
+
+            self._holds.cancel(key)
+
+        if not relevant or not all(c.matches(old, new) for c in monitor.conditions):
+            return
+
+        if monitor.event == HASS_STATE_CHANGED:
+            change = (HASS_STATE_CHANGED, event_data)
+
+        self._holds.start(key, monitor.duration, self._release_hold, monitor.intent, *change)
+
+    def _release_hold(self, intent: Intent, event: str, event_data: dict) -> None:
+        """
+        Deliver a change which has held for long enough.
+        """
+        self.hauto.bus.dispatch(event, (intent,), parent=self.api_name, **event_data)
+
+    def _flush_coalesced(self, key: tuple, event: str, event_data: dict) -> None:
+        """
+        Deliver the end of a burst.
+        """
+        target, _ = key
+
+        if isinstance(target, Monitor):
+            if all(c.matches(*views(event_data)) for c in target.conditions):
+                self.hauto.bus.dispatch(event, (target.intent,), parent=self.api_name, **event_data)
+
+            return
+
+        # a burst coalesced by configuration, deliver it like any other event
+        self._to_monitors(event, event_data)
+        intents = self.hauto.bus.candidates(event)
+
+        if intents:
+            self.hauto.bus.dispatch(event, intents, parent=self.api_name, **event_data)
+
     async def on_hass_event_receive(self, ctx: Context):
         """
         Called when Home Assistant forwards an event to Hauto.
         """
-        event = ctx.event_data['hass_event']
+        await self._ingest((ctx.event_data['hass_event'],))
 
-        if event.event_type == EVENT_STATE_CHANGED:
-            await self.fire(HASS_STATE_CHANGED, **event.data)
-            return
+    async def on_hass_events_receive(self, ctx: Context):
+        """
+        Called when Home Assistant forwards a burst of events to Hauto.
+
+        This happens on startup, or after a network heal, where many
+        thousands of state changes may arrive at once.
+        """
+        await self._ingest(ctx.event_data['hass_events'])
+
+    def _translate(self, hass_event: HassEvent) -> List[Tuple[str, dict]]:
+        """
+        Convert a Home Assistant event into the Hautomate events it causes.
+        """
+        if hass_event.event_type != EVENT_STATE_CHANGED:
+            # UNUSED EVENTS
+            # - TIME_CHANGED
+            # - SERVICE_REGISTERED
+            # - CALL_SERVICE
+            # - SERVICE_EXECUTED
+            # - AUTOMATION_RELOADED
+            # - SCENE_RELOADED
+            # - PLATFORM_DISCOVERED
+            # - COMPONENT_LOADED
+            #
+            # - HOMEASSISTANT_CLOSE
+            # - HOMEASSISTANT_STOP
+            #
+            return [(hass_event.event_type, hass_event.data)]
+
+        # a copy, so the views don't leak into Home Assistant's own event
+        data = {
+            **hass_event.data,
+            'old_view': StateView.of(hass_event.data['old_state']),
+            'new_view': StateView.of(hass_event.data['new_state']),
+        }
+        events = [(HASS_STATE_CHANGED, data)]
+        entity_event = self._classify_state_change(data)
 
-        # UNUSED EVENTS
-        # - TIME_CHANGED
-        # - SERVICE_REGISTERED
-        # - CALL_SERVICE
-        # - SERVICE_EXECUTED
-        # - AUTOMATION_RELOADED
-        # - SCENE_RELOADED
-        # - PLATFORM_DISCOVERED
-        # - COMPONENT_LOADED
-        #
-        # - HOMEASSISTANT_CLOSE
-        # - HOMEASSISTANT_STOP
-        #
-        await self.fire(event.event_type, **event.data)
-
-    async def on_hass_state_change(self, ctx: Context):
-        """
-        Called when a Home Assistant Entity is updated.
-        """
-        entity_id = ctx.event_data['entity_id']
-        old = ctx.event_data['old_state']
-        new = ctx.event_data['new_state']
+        if entity_event is not None:
+            events.append(entity_event)
+
+        return events
+
+    def _classify_state_change(self, event_data: dict) -> Optional[Tuple[str, dict]]:
+        """
+        Determine which kind of entity event a state change represents.
+
+        The entity event shares the parsed views of the state change.
+        """
+        entity_id = event_data['entity_id']
+        old, new = event_data['old_state'], event_data['new_state']
+        old_view, new_view = views(event_data)
+        shared = {'entity_id': entity_id, 'old_view': old_view, 'new_view': new_view}
 
         if old is None:
-            await self.fire(HASS_ENTITY_CREATE, entity_id=entity_id, new_entity=new)
-            return
+            return HASS_ENTITY_CREATE, {**shared, 'new_entity': new}
 
         if new is None:
-            await self.fire(HASS_ENTITY_REMOVE, entity_id=entity_id, old_entity=old)
-            return
+            return HASS_ENTITY_REMOVE, {**shared, 'old_entity': old}
 
         if old.state != new.state:
-            await self.fire(HASS_ENTITY_CHANGE, entity_id=entity_id, old_entity=old, new_entity=new)
-            return
+            return HASS_ENTITY_CHANGE, {**shared, 'old_entity': old, 'new_entity': new}
 
         # state changed, but attributes did
         if old != new:
-            await self.fire(HASS_ENTITY_UPDATE, entity_id=entity_id, old_entity=old, new_entity=new)
-            return
+            return HASS_ENTITY_UPDATE, {**shared, 'old_entity': old, 'new_entity': new}
 
         _log.warning(
             f'somehow we made it past all the possible state updates:'
@@ -180,6 +520,7 @@ class HomeAssistant(API):
             f'\n\told_state={old}'
             f'\n\tnew_state={new}'
         )
+        return None
 
     # Public Methods
 
@@ -191,6 +532,14 @@ class HomeAssistant(API):
         """
         return self.hass_interface.get_entity(entity_id)
 
+    @public_method
+    @safe_sync
+    def get_entities(self, domain: str=None) -> List[State]:
+        """
+        Retrieve all states, optionally only those within <domain>.
+        """
+        return self.hass_interface.get_entities(domain)
+
     @public_method
     async def create_helper(self, helper):
         """
@@ -220,66 +569,143 @@ class HomeAssistant(API):
 
         service_data : dict = None
           TODO
+
+        wait : bool = False
+          whether or not to wait for Home Assistant to confirm the call;
+          failures are raised when waiting, and logged otherwise
+
+        Returns
+        -------
+        result : Union[dict, bool, None]
+          Home Assistant's answer, if waited on
         """
-        coro = self.hass_interface.call_service(domain, service, service_data)
+        coro = self.hass_interface.call_service(domain, service, service_data, wait=wait)
         task = asyncio.create_task(coro)
 
         if wait:
-            await task
+            return await task
+
+        task.add_done_callback(_log_failed_call)
+
+    async def _call_grouped(
+        self,
+        service: str,
+        entity_id: Union[str, Iterable[str]],
+        *,
+        wait: bool,
+        data: dict
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Call homeassistant.<service> once per domain of the entities given.
+
+        The generic service works for every domain, even those without a
+        service of that name, eg. cover or group. Grouping by domain gives
+        each domain its own result.
+        """
+        entity_ids = [entity_id] if isinstance(entity_id, str) else list(entity_id)
+        groups = collections.defaultdict(list)
+
+        for entity_id in entity_ids:
+            domain, _, _ = entity_id.partition('.')
+            groups[domain].append(entity_id)
+
+        calls = [('homeassistant', service, {**data, 'entity_id': ids}) for ids in groups.values()]
+        task = asyncio.create_task(self.hass_interface.call_services(calls, wait=wait))
+
+        if not wait:
+            task.add_done_callback(_log_failed_calls)
+            return None
+
+        results = await task
+
+        return {e: result for ids, result in zip(groups.values(), results) for e in ids}
 
     @public_method
-    async def turn_on(self, entity_id: str, *, wait: bool=False, **data):
+    async def turn_on(
+        self,
+        entity_id: Union[str, Iterable[str]],
+        *,
+        wait: bool=False,
+        **data
+    ) -> Optional[Dict[str, Any]]:
         """
         Generic service to turn devices on under any domain.
 
         Parameters
         ----------
-        entity_id : str
-          TODO
+        entity_id : str or Iterable[str]
+          entity or entities to turn on, one service call is made per domain
 
         wait : bool = False
-          TODO
+          whether or not to wait for Home Assistant to confirm the calls
 
         **data
           service data to be sent into the service call
+
+        Returns
+        -------
+        results : Dict[str, Any]
+          if waited on, each entity's call result, or the exception it raised
         """
-        data['entity_id'] = entity_id
-        await self.call_service('homeassistant', 'turn_on', service_data=data, wait=wait)
+        return await self._call_grouped('turn_on', entity_id, wait=wait, data=data)
 
     @public_method
-    async def turn_off(self, entity_id: str, wait: bool=False):
+    async def turn_off(
+        self,
+        entity_id: Union[str, Iterable[str]],
+        *,
+        wait: bool=False,
+        **data
+    ) -> Optional[Dict[str, Any]]:
         """
         Generic service to turn devices off under any domain.
 
         Parameters
         ----------
-        entity_id : str
-          TODO
+        entity_id : str or Iterable[str]
+          entity or entities to turn off, one service call is made per domain
 
         wait : bool = False
-          TODO
+          whether or not to wait for Home Assistant to confirm the calls
+
+        **data
+          service data to be sent into the service call
+
+        Returns
+        -------
+        results : Dict[str, Any]
+          if waited on, each entity's call result, or the exception it raised
         """
-        data = {'entity_id': entity_id}
-        await self.call_service('homeassistant', 'turn_off', service_data=data, wait=wait)
+        return await self._call_grouped('turn_off', entity_id, wait=wait, data=data)
 
     @public_method
-    async def toggle(self, entity_id: str, *, wait: bool=False, **data):
+    async def toggle(
+        self,
+        entity_id: Union[str, Iterable[str]],
+        *,
+        wait: bool=False,
+        **data
+    ) -> Optional[Dict[str, Any]]:
         """
         Generic service to toggle devices on/off under any domain.
 
         Parameters
         ----------
-        entity_id : str
-          TODO
+        entity_id : str or Iterable[str]
+          entity or entities to toggle, one service call is made per domain
 
         wait : bool = False
-          TODO
+          whether or not to wait for Home Assistant to confirm the calls
 
         **data
           service data to be sent into the service call
+
+        Returns
+        -------
+        results : Dict[str, Any]
+          if waited on, each entity's call result, or the exception it raised
         """
-        data['entity_id'] = entity_id
-        await self.call_service('homeassistant', 'turn_off', service_data=data, wait=wait)
+        return await self._call_grouped('toggle', entity_id, wait=wait, data=data)
 
     @public_method
     async def fire_event(self, event_type: str, event_data: dict=None):
@@ -306,27 +732,42 @@ class HomeAssistant(API):
         domain: str=None,
         attribute: str=None,
         mode: str='CHANGE',
-        duration: Union[int, str]=None,
+        duration: Union[float, dt.timedelta]=None,
         from_value: str=None,
         to_value: str=None,
-        above_value: str=None,
-        below_value: str=None,
+        above_value: float=None,
+        below_value: float=None,
         inclusive: bool=False,
+        coalesce: float=None,
         fn: Callable,
         **intent_kwargs
     ) -> Intent:
         """
         Monitor an Entity for changes.
 
+        If <coalesce> is given, bursts of changes to the same entity are
+        collapsed into a single delivery of the latest state, at most
+        once every <coalesce> seconds.
 
+        If <duration> is given, a change is only delivered once the entity
+        has stayed that way for <duration> seconds, eg. a door left open
+        for 5 minutes. Without any values to hold, that is until the next
+        change of the monitored kind.
 
         # https://www.home-assistant.io/docs/automation/trigger
         #   /#numeric-state-trigger
         #   /#state-trigger
         """
-        # TODO
-        if duration is not None:
-            raise NotImplementedError('ComingSoon™')
+        if isinstance(duration, dt.timedelta):
+            duration = duration.total_seconds()
+        elif duration is not None and not isinstance(duration, (float, int)):
+            raise TypeError(f"'duration' must be of type float, got: '{duration}'")
+
+        if duration is not None and coalesce is not None:
+            raise TypeError(
+                "may not specify both 'duration' and 'coalesce', a monitor with a "
+                "duration already waits for its entity to settle"
+            )
 
         if not any((entity_id, domain)):
             raise TypeError(
@@ -340,7 +781,7 @@ class HomeAssistant(API):
                 f"not both, got: entity_id={entity_id}, domain={domain}"
             )
 
-        if any((from_value, to_value)) and any((above_value, below_value, inclusive)):
+        if any((from_value, to_value)) and (above_value, below_value) != (None, None):
             params = {
                 'from_value': from_value, 'to_value': to_value,
                 'above_value': above_value, 'below_value': below_value,
@@ -361,11 +802,16 @@ class HomeAssistant(API):
             'UPDATE': HASS_STATE_CHANGED      # literally any of the above
         }
 
-        if mode.upper() not in _ACCEPTED_MODES:
+        mode = mode.upper()
+
+        if mode not in _ACCEPTED_MODES:
             raise ValueError(
                 f"keyword argument 'mode' must be one of: {_ACCEPTED_MODES}, got '{mode}'"
             )
 
+        if duration is not None and mode in ('CREATE', 'REMOVE'):
+            raise TypeError(f"'duration' may not be used with mode '{mode}'")
+
         if mode == 'ATTRIBUTE' and attribute is None:
             raise TypeError(
                 "missing required keyword argument 'attribute', please specify an "
@@ -374,7 +820,13 @@ class HomeAssistant(API):
 
         # ...
 
-        checks = [EntityCheck(entity_id=entity_id, domain=domain)]
+        if entity_id is not None and not valid_entity_id(entity_id):
+            raise TypeError(
+                f'Invalid entity id encountered: {entity_id}. '
+                f'Format should be <domain>.<object_id>'
+            )
+
+        checks = []
 
         if mode in ('CHANGE', 'ATTRIBUTE', 'UPDATE'):
             if from_value or to_value:
@@ -385,7 +837,7 @@ class HomeAssistant(API):
                         )
                 checks.append(check)
 
-            if above_value or below_value:
+            if above_value is not None or below_value is not None:
                 check = ContinuousValueCheck(
                             above=above_value,
                             below=below_value,
@@ -394,22 +846,22 @@ class HomeAssistant(API):
                         )
                 checks.append(check)
 
-            # TODO
-            #
-            # if len(checks) == 1 and duration:
-            #     check = ValueDurationCheck()
-            #     checks.append(check)
-            #
-            # need logic for duration-check
-            # - check which delegates, wait, delegates, returns?
-            # - subclass of debounce?
-
         event = _ACCEPTED_MODES[mode]
+        conditions = ()
+
+        # value checks decide when a hold starts and ends, rather than gating a run
+        if duration is not None:
+            conditions, checks = tuple(checks), []
+
+        # numeric ranges are indexed, so that a value is compared once against them all
+        elif checks and isinstance(checks[0], ContinuousValueCheck):
+            conditions, checks = tuple(checks), []
 
         try:
             intent_kwargs['checks'].extend(checks)
         except KeyError:
             intent_kwargs['checks'] = checks
 
-        intent = Intent(event, fn=fn, **intent_kwargs)
+        intent = Intent(HASS_ENTITY_MONITOR, fn=fn, **intent_kwargs)
+        self._unrouted[intent] = (event, entity_id, domain, coalesce, duration, conditions)
         return intent
@@ -0,0 +1,228 @@
+from typing import Optional, NamedTuple, Tuple, List
+import collections
+import bisect
+
+from hautomate.apis.homeassistant.view import views
+from hautomate.enums import IntentState
+
+
+class Monitor(NamedTuple):
+    """
+    An Intent which monitors an entity, or all entities in a domain.
+
+    Monitors with a duration watch every state change of their entities,
+    and only fire once a change of the kind given by <event> has met
+    their <conditions>, and then held them for that many seconds.
+    Monitors which coalesce check their <conditions> against the end of
+    each burst instead.
+    """
+    intent: 'Intent'
+    entity_id: Optional[str]
+    domain: Optional[str]
+    coalesce: Optional[float]
+    duration: Optional[float] = None
+    conditions: Tuple['Check', ...] = ()
+    event: Optional[str] = None
+
+
+class MonitorIndex:
+    """
+    Route entity events to the Monitors which watch them.
+
+    Monitors are keyed by event and by either entity_id or domain, so
+    that finding the recipients of a state change costs a pair of
+    dictionary lookups, no matter how many entities are monitored.
+    """
+    def __init__(self):
+        self._by_entity = collections.defaultdict(list)
+        self._by_domain = collections.defaultdict(list)
+
+    def __len__(self) -> int:
+        return sum(map(len, self._by_entity.values())) + sum(map(len, self._by_domain.values()))
+
+    def add(self, event: str, monitor: Monitor) -> None:
+        """
+        Route <event> to <monitor>.
+        """
+        if monitor.entity_id is not None:
+            self._by_entity[(event, monitor.entity_id)].append(monitor)
+        else:
+            self._by_domain[(event, monitor.domain)].append(monitor)
+
+    def _lookup(self, index: dict, key: tuple) -> List[Monitor]:
+        try:
+            monitors = index[key]
+        except KeyError:
+            return []
+
+        if any(m.intent._state == IntentState.cancelled for m in monitors):
+            monitors[:] = [m for m in monitors if m.intent._state != IntentState.cancelled]
+
+            if not monitors:
+                del index[key]
+
+        return monitors
+
+    def match(self, event: str, entity_id: str) -> List[Monitor]:
+        """
+        Find all Monitors which watch <entity_id> for <event>.
+        """
+        domain, _, _ = entity_id.partition('.')
+        by_entity = self._lookup(self._by_entity, (event, entity_id))
+        by_domain = self._lookup(self._by_domain, (event, domain))
+
+        if not by_domain:
+            return by_entity
+
+        return [*by_entity, *by_domain]
+
+
+class _Bounds:
+    """
+    Numeric thresholds on a single value, sorted for binary search.
+
+    Ranges with a lower bound are kept sorted by it; every range whose
+    lower bound lies below a value is a prefix of that list, found with
+    one bisect. Ranges with only an upper bound are kept likewise, as a
+    suffix. Bounds which are inclusive are kept apart from those which
+    are not, as they bisect to different sides of an equal value.
+    """
+    def __init__(self):
+        # {inclusive: ([bound, ...], [Monitor, ...])}
+        self._above = {False: ([], []), True: ([], [])}
+        self._below = {False: ([], []), True: ([], [])}
+
+    def __len__(self) -> int:
+        return sum(len(ms) for _, ms in (*self._above.values(), *self._below.values()))
+
+    def _lists(self, check: 'ContinuousValueCheck') -> Tuple[list, list, float]:
+        if check.above is not None:
+            return (*self._above[check.inclusive], check.above)
+
+        return (*self._below[check.inclusive], check.below)
+
+    def add(self, monitor: Monitor) -> None:
+        check, = monitor.conditions
+        bounds, monitors, bound = self._lists(check)
+        i = bisect.bisect_right(bounds, bound)
+        bounds.insert(i, bound)
+        monitors.insert(i, monitor)
+
+    def remove(self, monitor: Monitor) -> None:
+        check, = monitor.conditions
+        bounds, monitors, _ = self._lists(check)
+        i = monitors.index(monitor)
+        del bounds[i]
+        del monitors[i]
+
+    def match(self, value: float) -> List[Monitor]:
+        """
+        Find all Monitors whose range contains <value>.
+        """
+        matched = []
+
+        for inclusive, (bounds, monitors) in self._above.items():
+            end = (bisect.bisect_right if inclusive else bisect.bisect_left)(bounds, value)
+
+            # only those bounded on both sides need a second look
+            matched.extend(
+                m for m in monitors[:end]
+                if m.conditions[0].below is None or m.conditions[0].contains(value)
+            )
+
+        for inclusive, (bounds, monitors) in self._below.items():
+            start = (bisect.bisect_left if inclusive else bisect.bisect_right)(bounds, value)
+            matched.extend(monitors[start:])
+
+        return matched
+
+
+class ThresholdIndex:
+    """
+    Route entity events to the Monitors whose numeric range they land in.
+
+    Monitors are grouped by event, entity_id or domain, and attribute, so
+    that the value of an entity is parsed once per event, no matter how
+    many thresholds watch it, and all ranges it lands in are found by
+    binary search.
+    """
+    def __init__(self):
+        self._bounds = collections.defaultdict(_Bounds)
+        self._attributes = collections.defaultdict(set)
+        self._routes = {}
+
+    def __len__(self) -> int:
+        return sum(map(len, self._bounds.values()))
+
+    def add(self, event: str, monitor: Monitor) -> None:
+        """
+        Route <event> to <monitor>, if the value is in range.
+        """
+        check, = monitor.conditions
+        target = monitor.entity_id if monitor.entity_id is not None else monitor.domain
+        self._bounds[(event, target, check.attribute)].add(monitor)
+        self._attributes[(event, target)].add(check.attribute)
+        self._routes[monitor.intent] = (event, monitor)
+
+    def discard(self, intent: 'Intent') -> None:
+        """
+        Stop routing events to <intent>, if they ever were.
+        """
+        try:
+            event, monitor = self._routes[intent]
+        except KeyError:
+            return
+
+        self._remove(event, monitor)
+
+    def _lookup(self, event: str, target: str, new: 'StateView') -> List[Monitor]:
+        attributes = self._attributes.get((event, target))
+
+        if not attributes:
+            return []
+
+        matched = []
+
+        for attribute in attributes:
+            value = new.number(attribute)
+
+            if value is not None:
+                matched.extend(self._bounds[(event, target, attribute)].match(value))
+
+        return matched
+
+    def match(self, event: str, entity_id: str, event_data: dict) -> List[Monitor]:
+        """
+        Find all Monitors on <entity_id> for <event> whose range holds its value.
+        """
+        if not self._bounds:
+            return []
+
+        _, new = views(event_data)
+
+        if new is None:
+            return []
+
+        domain, _, _ = entity_id.partition('.')
+        matched = [*self._lookup(event, entity_id, new), *self._lookup(event, domain, new)]
+
+        for monitor in [m for m in matched if m.intent._state == IntentState.cancelled]:
+            self._remove(event, monitor)
+            matched.remove(monitor)
+
+        return matched
+
+    def _remove(self, event: str, monitor: Monitor) -> None:
+        check, = monitor.conditions
+        target = monitor.entity_id if monitor.entity_id is not None else monitor.domain
+        key = (event, target, check.attribute)
+        bounds = self._bounds[key]
+        bounds.remove(monitor)
+        del self._routes[monitor.intent]
+
+        if not bounds:
+            del self._bounds[key]
+            self._attributes[(event, target)].discard(check.attribute)
+
+            if not self._attributes[(event, target)]:
+                del self._attributes[(event, target)]
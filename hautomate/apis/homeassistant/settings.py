@@ -18,12 +18,48 @@ class Config(Settings):
 
     hass_interface : HomeAssistant, default None
       the homeassistant inferface
+
+    coalesce : float, default None
+      window in seconds over which bursts of HASS_ENTITY_CHANGE and
+      HASS_ENTITY_UPDATE events are collapsed per entity, default is no
+      coalescing
+
+    timeout : float, default 10
+      seconds to wait for Home Assistant to answer a websocket request
+
+    reconnect_delay : float, default 1
+      seconds to wait before reconnecting a dropped websocket, doubled
+      after every failed attempt
+
+    max_reconnect_delay : float, default 60
+      upper bound on the wait between attempts to reconnect
+
+    codec : str, one of 'orjson', 'ujson', or 'json', default None
+      JSON library for the websocket, default is the fastest installed
+
+    max_connections : int, default 10
+      size of the pool of HTTP connections to Home Assistant's REST API
+
+    retries : int, default 3
+      attempts to make an HTTP request which failed to connect
+
+    max_message_size : int, default 64 MiB
+      largest websocket message accepted from Home Assistant, or None for
+      no limit
     """
     feed: HassFeed = 'WEBSOCKET'
     hass_interface: Optional[HomeAssistant] = None
     host: Optional[HttpUrl] = None
     port: Optional[int] = 8123
     access_token: Optional[str] = None
+    coalesce: Optional[float] = None
+    timeout: float = 10
+    reconnect_delay: float = 1
+    max_reconnect_delay: float = 60
+    codec: Optional[str] = None
+    max_connections: int = 10
+    retries: int = 3
+    max_message_size: Optional[int] = 64 * 2 ** 20
 
     @validator('feed', pre=True)
     def _str_upper(cls, enum_candidate):
@@ -0,0 +1,116 @@
+from typing import Optional, Tuple, Any
+import datetime as dt
+
+from homeassistant.core import State
+
+
+_MISSING = 'SENTINEL_NULL'
+
+
+class StateView:
+    """
+    A parsed view of an entity's State.
+
+    One view is built for each side of a state change, and shared by
+    every Check and Monitor which handles it, so that the state and its
+    attributes are parsed as numbers at most once per event.
+
+    Attributes
+    ----------
+    entity : State
+      the state this is a view of
+    """
+    __slots__ = ('entity', '_numbers')
+
+    def __init__(self, entity: State):
+        self.entity = entity
+        self._numbers = {}
+
+    @classmethod
+    def of(cls, entity: Optional[State]) -> Optional['StateView']:
+        """
+        Build a view of <entity>, or None if there is no entity.
+        """
+        return None if entity is None else cls(entity)
+
+    def __repr__(self) -> str:
+        return f'<StateView {self.entity.entity_id}={self.entity.state!r}>'
+
+    @property
+    def entity_id(self) -> str:
+        return self.entity.entity_id
+
+    @property
+    def last_changed(self) -> dt.datetime:
+        return self.entity.last_changed
+
+    @property
+    def last_updated(self) -> dt.datetime:
+        return self.entity.last_updated
+
+    def value(self, attribute: str=None) -> Any:
+        """
+        Retrieve the state, or one of its attributes.
+
+        Parameters
+        ----------
+        attribute : str = None
+          attribute to retrieve, rather than the state
+
+        Returns
+        -------
+        value : Any
+        """
+        if attribute is not None:
+            return self.entity.attributes.get(attribute, _MISSING)
+
+        return self.entity.state
+
+    def number(self, attribute: str=None) -> Optional[float]:
+        """
+        Retrieve the state, or one of its attributes, as a number.
+
+        States arrive as strings, eg. '21.5', 'unknown', or 'unavailable'.
+        Those which aren't numbers are None.
+
+        Parameters
+        ----------
+        attribute : str = None
+          attribute to retrieve, rather than the state
+
+        Returns
+        -------
+        number : float or None
+        """
+        try:
+            return self._numbers[attribute]
+        except KeyError:
+            pass
+
+        try:
+            number = float(self.value(attribute))
+        except (TypeError, ValueError):
+            number = None
+
+        self._numbers[attribute] = number
+        return number
+
+
+def views(event_data: dict) -> Tuple[Optional[StateView], Optional[StateView]]:
+    """
+    Find the before and after of an entity event, or a raw state change.
+
+    Events translated by the HomeAssistant API carry views already, any
+    others have theirs built here.
+    """
+    try:
+        return event_data['old_view'], event_data['new_view']
+    except KeyError:
+        pass
+
+    if 'old_entity' in event_data or 'new_entity' in event_data:
+        old, new = event_data.get('old_entity'), event_data.get('new_entity')
+    else:
+        old, new = event_data.get('old_state'), event_data.get('new_state')
+
+    return StateView.of(old), StateView.of(new)
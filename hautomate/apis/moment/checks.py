@@ -1,6 +1,5 @@
 from typing import Union
 import datetime as dt
-import asyncio
 
 import pendulum
 
@@ -35,6 +34,7 @@ class MomentaryCheck(Check):
 
         if cmp_dattim <= soon:
             sec = soon.timestamp() - cmp_dattim.timestamp()
-            return await asyncio.sleep(sec, True)
+            await moment.sleep(sec)
+            return True
 
         return False
@@ -0,0 +1,183 @@
+from typing import FrozenSet, Tuple
+import datetime as dt
+
+import pendulum
+
+
+_MONTHS = {
+    name: number for number, name in enumerate(
+        ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC'),
+        start=1
+    )
+}
+
+_WEEKDAYS = {
+    name: number for number, name in enumerate(
+        ('SUN', 'MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT')
+    )
+}
+
+_ALIASES = {
+    '@YEARLY': '0 0 1 1 *',
+    '@ANNUALLY': '0 0 1 1 *',
+    '@MONTHLY': '0 0 1 * *',
+    '@WEEKLY': '0 0 * * 0',
+    '@DAILY': '0 0 * * *',
+    '@MIDNIGHT': '0 0 * * *',
+    '@HOURLY': '0 * * * *',
+}
+
+#         name, lo, hi, names
+_FIELDS = (
+    ('minute', 0, 59, {}),
+    ('hour', 0, 23, {}),
+    ('day of month', 1, 31, {}),
+    ('month', 1, 12, _MONTHS),
+    ('day of week', 0, 7, _WEEKDAYS),
+)
+
+# the longest gap between two matches of any valid expression is a leap day
+_MAX_SEARCH_DAYS = 366 * 8
+
+
+def _parse_value(text: str, names: dict, field: str) -> int:
+    try:
+        return names[text]
+    except KeyError:
+        pass
+
+    try:
+        return int(text)
+    except ValueError:
+        raise ValueError(f"invalid value '{text}' for cron field '{field}'") from None
+
+
+def _parse_field(text: str, field: str, lo: int, hi: int, names: dict) -> FrozenSet[int]:
+    """
+    Expand a single cron field into the set of values it matches.
+    """
+    values = set()
+
+    for part in text.upper().split(','):
+        rng, has_step, step = part.partition('/')
+        step = _parse_value(step, {}, field) if has_step else 1
+
+        if rng == '*':
+            start, end = lo, hi
+        elif '-' in rng:
+            start, end = (_parse_value(v, names, field) for v in rng.split('-', 1))
+        else:
+            start = _parse_value(rng, names, field)
+            end = hi if has_step else start
+
+        if not lo <= start <= end <= hi or step < 1:
+            raise ValueError(f"invalid range '{part}' for cron field '{field}'")
+
+        values.update(range(start, end + 1, step))
+
+    return frozenset(values)
+
+
+class CronExpression:
+    """
+    A compiled, five-field cron expression.
+
+    Supports lists, ranges, steps, month and weekday names, as well as
+    the usual @hourly, @daily, etc. aliases. Like most crons, when both
+    day-of-month and day-of-week are restricted, a day matches if
+    either of them do.
+
+    The next fire time is computed directly in wall clock time, and then
+    localized to <tz>. Times which are skipped by a DST transition fire
+    right after the transition, and times which are repeated by a DST
+    transition only fire once.
+
+    Parameters
+    ----------
+    expression : str
+      a cron expression, eg. '*/5 6-22 * * MON-FRI'
+
+    tz : str or pendulum.Timezone = 'UTC'
+      timezone in which the expression is evaluated
+    """
+    def __init__(self, expression: str, *, tz: str='UTC'):
+        self.expression = expression
+        self.tz = pendulum.timezone(tz) if isinstance(tz, str) else tz
+        fields = _ALIASES.get(expression.strip().upper(), expression).split()
+
+        if len(fields) != 5:
+            raise ValueError(
+                f"cron expression must have 5 fields, got {len(fields)}: '{expression}'"
+            )
+
+        minutes, hours, days, months, weekdays = (
+            _parse_field(text, *spec) for text, spec in zip(fields, _FIELDS)
+        )
+
+        self.minutes: Tuple[int, ...] = tuple(sorted(minutes))
+        self.hours: Tuple[int, ...] = tuple(sorted(hours))
+        self.days = days
+        self.months = months
+        self.weekdays = frozenset(d % 7 for d in weekdays)
+        self._days_restricted = not fields[2].startswith('*')
+        self._weekdays_restricted = not fields[4].startswith('*')
+
+    def _day_matches(self, day: dt.date) -> bool:
+        if day.month not in self.months:
+            return False
+
+        dom = day.day in self.days
+        dow = (day.weekday() + 1) % 7 in self.weekdays
+
+        if self._days_restricted and self._weekdays_restricted:
+            return dom or dow
+
+        return dom and dow
+
+    def _localize(self, day: dt.date, hour: int, minute: int, after: pendulum.DateTime):
+        """
+        Find the earliest instant of a wall clock time which is after <after>.
+        """
+        pre, post = (
+            pendulum.datetime(
+                day.year, day.month, day.day, hour, minute, tz=self.tz, dst_rule=rule
+            )
+            for rule in (pendulum.PRE_TRANSITION, pendulum.POST_TRANSITION)
+        )
+
+        # skipped by DST, the only sensible instant is after the transition
+        if (pre.hour, pre.minute) != (hour, minute):
+            pre = post
+
+        return min((c for c in (pre, post) if c > after), default=None)
+
+    def next_after(self, after: pendulum.DateTime) -> pendulum.DateTime:
+        """
+        Compute the first moment this expression matches, after <after>.
+        """
+        local = after.in_timezone(self.tz)
+        day = local.date()
+        first_day = True
+
+        for _ in range(_MAX_SEARCH_DAYS):
+            if self._day_matches(day):
+                for hour in self.hours:
+                    if first_day and hour < local.hour:
+                        continue
+
+                    for minute in self.minutes:
+                        if first_day and (hour, minute) <= (local.hour, local.minute):
+                            continue
+
+                        when = self._localize(day, hour, minute, after)
+
+                        if when is not None:
+                            return when
+
+            day += dt.timedelta(days=1)
+            first_day = False
+
+        raise ValueError(f"cron expression '{self.expression}' never matches")
+
+    def __repr__(self):
+        return f"CronExpression('{self.expression}', tz={self.tz.name})"
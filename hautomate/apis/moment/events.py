@@ -1,3 +1,4 @@
 
 EVT_TIME_UPDATE = 'TIME_UPDATE'
 EVT_TIME_SLIPPAGE = 'TIME_SLIPPAGE'
+EVT_TIME_SCHEDULED = 'TIME_SCHEDULED'
@@ -1,17 +1,20 @@
 from typing import Union, Callable
 import datetime as dt
 import asyncio
+import itertools as it
 import logging
+import weakref
+import heapq
 import time
 
 import pendulum
 
-from hautomate.apis.moment.checks import MomentaryCheck
-from hautomate.apis.moment.events import EVT_TIME_UPDATE, EVT_TIME_SLIPPAGE
+from hautomate.apis.moment.schedule import Schedule, Scheduler, Once, Every, Daily, Cron
+from hautomate.apis.moment.events import EVT_TIME_UPDATE, EVT_TIME_SLIPPAGE, EVT_TIME_SCHEDULED
 from hautomate.util.async_ import safe_sync
 from hautomate.context import Context
+from hautomate.errors import HautoError
 from hautomate.intent import Intent
-from hautomate.check import Throttle
 from hautomate.api import API, api_method, public_method
 
 
@@ -22,6 +25,16 @@ class Moment(API):
     """
     API for working with absolute and relative dates and times.
 
+    Intents created by this API are not polled on every TIME_UPDATE.
+    Instead, they are handed to a Scheduler once subscribed, which fires
+    each of them directly as TIME_SCHEDULED when it's due.
+
+    When simulating, the virtual clock stands still until it's explicitly
+    advanced, at which point it jumps from one deadline to the next. This
+    allows replaying days worth of automations in a matter of seconds.
+    There is no heartbeat while simulating, so neither TIME_UPDATE nor
+    TIME_SLIPPAGE are fired.
+
     Parameters
     ----------
     hauto : Hautomate
@@ -35,19 +48,33 @@ class Moment(API):
 
     epoch : pendulum.DateTime = None
       start of the virtual clock, default is None, to mean no initial skew
+
+    simulate : bool = False
+      whether or not to run the virtual clock as a discrete-event simulation
     """
+    # number of event loop iterations without progress before a deadline is
+    # considered to be fully processed, see ._settle
+    _SETTLE_PASSES = 8
+
     def __init__(
         self,
         hauto,
         *,
         resolution: float=0.25,
         speed: float=1.00,
-        epoch: pendulum.DateTime=None
+        epoch: pendulum.DateTime=None,
+        simulate: bool=False
     ):
         self.resolution = resolution
         self.speed = speed
         self.epoch = epoch or pendulum.now(tz=hauto.config.timezone)
+        self.simulate = simulate
         self._monotonic_epoch = time.perf_counter()
+        self._simulated_elapsed = 0.0
+        self._sleepers = []
+        self._sleeper_counter = it.count()
+        self._scheduler = Scheduler(self)
+        self._unscheduled = weakref.WeakKeyDictionary()
         super().__init__(hauto)
 
     # Listeners and Internal Methods
@@ -57,7 +84,111 @@ class Moment(API):
         """
         Called once Hautomate is ready to begin processing events.
         """
-        asyncio.create_task(self._tick())
+        if not self.simulate:
+            asyncio.create_task(self._tick())
+
+        self._scheduler.start()
+
+    @safe_sync
+    def on_close(self, ctx: Context):
+        """
+        Called once Hautomate begins to shut down.
+        """
+        self._scheduler.stop()
+
+    @safe_sync
+    def on_intent_subscribe(self, ctx: Context):
+        """
+        Called when any Intent is subscribed to the event bus.
+
+        Intents created by Moment are handed off to the Scheduler the
+        moment they're subscribed.
+        """
+        intent = ctx.event_data['created_intent']
+
+        try:
+            schedule = self._unscheduled.pop(intent)
+        except KeyError:
+            return
+
+        self._scheduler.add(intent, schedule)
+
+    def _scheduled_intent(self, schedule: Schedule, fn: Callable, **intent_kwargs) -> Intent:
+        """
+        Build an Intent which fires according to <schedule>.
+        """
+        intent = Intent(EVT_TIME_SCHEDULED, fn=fn, **intent_kwargs)
+        self._unscheduled[intent] = schedule
+        return intent
+
+    def _parse_when(
+        self,
+        when: Union[pendulum.DateTime, str, int]
+    ) -> Union[pendulum.DateTime, pendulum.Time]:
+        """
+        Convert user input into a specific moment or time of day.
+        """
+        if isinstance(when, (dt.datetime, int)):
+            try:
+                when = when.timestamp()
+            except AttributeError:
+                pass
+
+            # ensure pendulum.DateTime
+            return pendulum.from_timestamp(when, tz='UTC')
+
+        # str parsing
+        dattim = pendulum.parse(str(when), exact=True)
+
+        if isinstance(dattim, pendulum.Time):
+            return dattim
+
+        if isinstance(dattim, pendulum.DateTime):
+            return dattim
+
+        # conversion to DateTime will mean YYYY/MM/DD 00:00:00
+        return pendulum.parse(f'{dattim} 00:00:00', tz='UTC')
+
+    def _daily(self, time: pendulum.Time) -> Daily:
+        """
+        Recur at a wall-clock time of day, in Hautomate's timezone.
+        """
+        return Daily(time, tz=self.hauto.config.timezone)
+
+    def _wake_sleepers(self, now: pendulum.DateTime) -> None:
+        """
+        Resume all virtual sleepers which are due at <now>.
+        """
+        ts = now.timestamp()
+
+        while self._sleepers and self._sleepers[0][0] <= ts:
+            *_, waiter = heapq.heappop(self._sleepers)
+
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def _settle(self, tasks: list) -> None:
+        """
+        Let the event loop catch up with everything a deadline set off.
+
+        Returns once the loop stops making progress. That is, <tasks> are
+        either done or waiting on a later virtual deadline, and no thread
+        pool has outstanding work.
+        """
+        pending = set(tasks)
+        idle = 0
+
+        while idle < self._SETTLE_PASSES:
+            before = (len(pending), len(self._sleepers), len(self._scheduler))
+            await asyncio.sleep(0)
+            pending = {t for t in pending if not t.done()}
+            after = (len(pending), len(self._sleepers), len(self._scheduler))
+            busy = any(
+                stats['running'] or stats['queued']
+                for stats in self.hauto.executors.stats().values()
+            )
+
+            idle = 0 if busy or before != after else idle + 1
 
     async def _tick(self):
         """
@@ -83,6 +214,9 @@ class Moment(API):
         """
         Return the current time.
         """
+        if self.simulate:
+            return self.epoch.add(seconds=self._simulated_elapsed)
+
         elapsed = time.perf_counter() - self._monotonic_epoch
         return self.epoch.add(seconds=elapsed * self.speed)
 
@@ -118,6 +252,128 @@ class Moment(API):
             m = f"keyword argument must be one of: 'realtime' or 'virtual', got: {to}"
             raise ValueError(m) from None
 
+    @public_method
+    @safe_sync
+    def call_later(self, seconds: float, callback: Callable, *a):
+        """
+        Schedule a callback after an amount of virtual time.
+
+        Parameters
+        ----------
+        seconds : float
+          amount of virtual time to wait
+
+        callback : Callable
+          plain function to call, along with any positional arguments
+
+        Returns
+        -------
+        handle : asyncio.TimerHandle or asyncio.Future
+          anything with a .cancel() method
+        """
+        if not self.simulate:
+            return self.hauto.loop.call_later(self.scale_time(seconds, to='realtime'), callback, *a)
+
+        deadline = self.now().timestamp() + max(0, seconds)
+        waiter = self.hauto.loop.create_future()
+        waiter.add_done_callback(lambda fut: fut.cancelled() or callback(*a))
+        heapq.heappush(self._sleepers, (deadline, next(self._sleeper_counter), waiter))
+        return waiter
+
+    @public_method
+    async def sleep(self, seconds: float) -> None:
+        """
+        Suspend the caller for an amount of virtual time.
+
+        While simulating, the caller is resumed once the virtual clock
+        has been advanced far enough.
+
+        Parameters
+        ----------
+        seconds : float
+          amount of virtual time to sleep for
+        """
+        if not self.simulate:
+            await asyncio.sleep(self.scale_time(seconds, to='realtime'))
+            return
+
+        deadline = self.now().timestamp() + max(0, seconds)
+        waiter = self.hauto.loop.create_future()
+        heapq.heappush(self._sleepers, (deadline, next(self._sleeper_counter), waiter))
+        await waiter
+
+    @public_method
+    async def advance_to(self, when: Union[pendulum.DateTime, str, int]) -> pendulum.DateTime:
+        """
+        Fast-forward the simulated clock to a specific moment.
+
+        Rather than waiting in realtime, the clock jumps directly to each
+        deadline between now and <when>. All Intents and sleepers due at
+        a deadline are run to completion before moving on to the next.
+
+        Parameters
+        ----------
+        when : pendulum.DateTime, str, or int
+          moment to advance to, in any of the forms accepted by .at
+
+        Returns
+        -------
+        now : pendulum.DateTime
+        """
+        if not self.simulate:
+            raise HautoError('the clock can only be advanced when Moment is simulating')
+
+        target = self._parse_when(when)
+
+        if isinstance(target, pendulum.Time):
+            target = self._daily(target).first(self.now())
+
+        target_ts = target.timestamp()
+        epoch_ts = self.epoch.timestamp()
+
+        if target_ts < self.now().timestamp():
+            raise ValueError(f'cannot advance the clock backwards, to: {target}')
+
+        while True:
+            deadlines = [self._scheduler.next_due]
+
+            if self._sleepers:
+                deadlines.append(self._sleepers[0][0])
+
+            deadlines = [ts for ts in deadlines if ts is not None and ts <= target_ts]
+
+            if not deadlines:
+                break
+
+            self._simulated_elapsed = max(min(deadlines) - epoch_ts, self._simulated_elapsed)
+            now = self.now()
+            tasks = self._scheduler.fire_due(now)
+            self._wake_sleepers(now)
+            await self._settle(tasks)
+
+        self._simulated_elapsed = target_ts - epoch_ts
+        await self._settle([])
+        return self.now()
+
+    @public_method
+    async def advance(self, seconds: Union[float, pendulum.Duration]) -> pendulum.DateTime:
+        """
+        Fast-forward the simulated clock by an amount of time.
+
+        Parameters
+        ----------
+        seconds : float or pendulum.Duration
+          amount of virtual time to advance by
+
+        Returns
+        -------
+        now : pendulum.DateTime
+        """
+        if isinstance(seconds, dt.timedelta):
+            seconds = seconds.total_seconds()
+
+        return await self.advance_to(self.now().add(seconds=seconds))
+
     # Intents
 
     @api_method
@@ -151,39 +407,18 @@ class Moment(API):
         -------
         intent : Intent
         """
-        try:
-            intent_kwargs['checks']
-        except KeyError:
-            intent_kwargs['checks'] = []
-
         if isinstance(when, (dt.datetime, int)):
-            try:
-                when = when.timestamp()
-            except AttributeError:
-                pass
-
-            # ensure pendulum.DateTime
-            when = pendulum.from_timestamp(when, tz='UTC')
-
             intent_kwargs['limit'] = intent_kwargs.get('limit', 1)
-            intent_kwargs['checks'].append(MomentaryCheck(when))
-            intent = Intent(EVT_TIME_UPDATE, fn=fn, **intent_kwargs)
-        else:
-            # str parsing
-            dattim = pendulum.parse(str(when), exact=True)
-
-            if isinstance(dattim, pendulum.Date):
-                # conversion to DateTime will mean YYYY/MM/DD 00:00:00
-                when = pendulum.parse(f'{dattim} 00:00:00', tz='UTC')
-                intent_kwargs['checks'].append(MomentaryCheck(when))
 
-            if isinstance(dattim, pendulum.Time):
-                # recurrence at a specific time
-                intent_kwargs['checks'].append(MomentaryCheck(dattim))
+        when = self._parse_when(when)
 
-            intent = Intent(EVT_TIME_UPDATE, fn=fn, **intent_kwargs)
+        if isinstance(when, pendulum.Time):
+            # recurrence at a specific time
+            schedule = self._daily(when)
+        else:
+            schedule = Once(when)
 
-        return intent
+        return self._scheduled_intent(schedule, fn=fn, **intent_kwargs)
 
     @api_method
     def soon(
@@ -225,7 +460,7 @@ class Moment(API):
             raise ValueError(f"'delay' must be of type float, got: {type(delay)}")
 
         when = self.hauto.now.add(seconds=delay)
-        return self.at(when, fn=fn, **intent_kwargs)
+        return self.at(when, fn=fn, subscribe=False, **intent_kwargs)
 
     @api_method
     def every(
@@ -262,24 +497,39 @@ class Moment(API):
         # '5 minutes'
         # '5 min'
         # '5m'
-        try:
-            intent_kwargs['checks']
-        except KeyError:
-            intent_kwargs['checks'] = []
-
         if isinstance(delta, dt.timedelta):
-            cooldown = Throttle(delta.total_seconds())
-        elif isinstance(delta, (float, int)):
-            cooldown = Throttle(delta)
-        else:
+            delta = delta.total_seconds()
+        elif not isinstance(delta, (float, int)):
             raise TypeError(f"'delta' must be of type float, got: '{delta}'")
 
-        intent_kwargs['checks'].append(cooldown)
+        start = self._parse_when(when)
+
+        if isinstance(start, pendulum.Time):
+            start = self._daily(start).first(self.now())
+
         intent_kwargs['limit'] = intent_kwargs.get('limit', -1)
-        return self.at(when, fn=fn, **intent_kwargs)
+        return self._scheduled_intent(Every(delta, start=start), fn=fn, **intent_kwargs)
+
+    @api_method
+    def cron(self, pattern: str, *, fn: Callable, **intent_kwargs) -> Intent:
+        """
+        Schedule an Intent to run whenever a cron expression matches.
+
+        Can be used as an App function decorator. If used inline, this
+        method expects a keyword argument 'fn', the intended method to
+        call upon meeting the criteria. All other keyword arguments are
+        passed into the Intent.
 
-    # TODO ... accept cron-like
-    #
-    # @api_method
-    # def cron(self, pattern: str, fn: Callable, **intent_kwargs) -> Intent:
-    #     pass
+        Parameters
+        ----------
+        pattern : str
+            five-field cron expression, evaluated in Hautomate's timezone
+                eg. '*/5 6-22 * * MON-FRI'
+
+        Returns
+        -------
+        intent : Intent
+        """
+        schedule = Cron(pattern, tz=self.hauto.config.timezone)
+        intent_kwargs['limit'] = intent_kwargs.get('limit', -1)
+        return self._scheduled_intent(schedule, fn=fn, **intent_kwargs)
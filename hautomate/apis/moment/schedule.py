@@ -0,0 +1,274 @@
+from typing import Optional, Tuple, List
+import datetime as dt
+import itertools as it
+import asyncio
+import logging
+import heapq
+
+import pendulum
+
+from hautomate.apis.moment.events import EVT_TIME_SCHEDULED
+from hautomate.apis.moment.cron import CronExpression
+from hautomate.enums import IntentState
+
+
+_log = logging.getLogger(__name__)
+
+
+class Schedule:
+    """
+    Describe when an Intent should fire.
+
+    Subclasses must implement .first and .next, which together produce
+    the sequence of moments an Intent is due.
+    """
+    def first(self, now: pendulum.DateTime) -> Optional[pendulum.DateTime]:
+        """
+        Moment of the first fire, given the current time.
+        """
+        raise NotImplementedError()
+
+    def next(
+        self,
+        previous: pendulum.DateTime,
+        now: pendulum.DateTime
+    ) -> Optional[pendulum.DateTime]:
+        """
+        Moment of the fire after <previous>, or None if there is none.
+        """
+        raise NotImplementedError()
+
+
+class Once(Schedule):
+    """
+    Fire a single time at a specific moment.
+    """
+    def __init__(self, when: pendulum.DateTime):
+        self.when = when
+
+    def first(self, now: pendulum.DateTime) -> pendulum.DateTime:
+        return self.when
+
+    def next(self, previous: pendulum.DateTime, now: pendulum.DateTime) -> None:
+        return None
+
+    def __repr__(self):
+        return f'Once({self.when})'
+
+
+class Every(Schedule):
+    """
+    Fire regularly, every <seconds>, starting at <start>.
+
+    If the schedule falls behind, missed fires are skipped rather than
+    run in a burst.
+    """
+    def __init__(self, seconds: float, *, start: pendulum.DateTime):
+        if seconds <= 0:
+            raise ValueError(f"'delta' must be a positive amount of time, got: {seconds}")
+
+        self.seconds = seconds
+        self.start = start
+
+    def first(self, now: pendulum.DateTime) -> pendulum.DateTime:
+        return max(self.start, now)
+
+    def next(self, previous: pendulum.DateTime, now: pendulum.DateTime) -> pendulum.DateTime:
+        when = previous.add(seconds=self.seconds)
+
+        if when <= now:
+            when = now.add(seconds=self.seconds)
+
+        return when
+
+    def __repr__(self):
+        return f'Every({self.seconds}s, start={self.start})'
+
+
+class Daily(Schedule):
+    """
+    Fire once a day, at a specific time.
+    """
+    def __init__(self, time: pendulum.Time, *, tz: str='UTC'):
+        self.time = time
+        self.tz = tz
+
+    def _on_or_after(self, moment: pendulum.DateTime) -> pendulum.DateTime:
+        local = moment.in_timezone(self.tz)
+        dattim = dt.datetime.combine(local.date(), self.time)
+        when = pendulum.instance(dattim, tz=self.tz)
+
+        if when < moment:
+            when = when.add(days=1)
+
+        return when
+
+    def first(self, now: pendulum.DateTime) -> pendulum.DateTime:
+        return self._on_or_after(now)
+
+    def next(self, previous: pendulum.DateTime, now: pendulum.DateTime) -> pendulum.DateTime:
+        return self._on_or_after(max(previous, now).add(seconds=1))
+
+    def __repr__(self):
+        return f'Daily({self.time}, tz={self.tz})'
+
+
+class Cron(Schedule):
+    """
+    Fire whenever a cron expression matches.
+    """
+    def __init__(self, expression: str, *, tz: str='UTC'):
+        self.expression = CronExpression(expression, tz=tz)
+
+    def first(self, now: pendulum.DateTime) -> pendulum.DateTime:
+        return self.expression.next_after(now)
+
+    def next(self, previous: pendulum.DateTime, now: pendulum.DateTime) -> pendulum.DateTime:
+        return self.expression.next_after(max(previous, now))
+
+    def __repr__(self):
+        return f'Cron({self.expression.expression}, tz={self.expression.tz.name})'
+
+
+class Scheduler:
+    """
+    A min-heap of Intents, keyed by the moment they are next due.
+
+    Rather than polling every Intent on a regular tick, the Scheduler
+    arms a single loop.call_at timer for whichever Intent is due first.
+    The cost of scheduling then scales with the number of actual fires,
+    not with the number of waiting Intents.
+
+    When Moment is simulating, no timer is armed at all. Instead, the
+    virtual clock is advanced from deadline to deadline with .fire_due.
+
+    Parameters
+    ----------
+    moment : Moment
+      the Moment API, which owns the virtual clock
+    """
+    # loop timers may fire up to a clock tick early
+    _TOLERANCE = 0.001
+
+    def __init__(self, moment: 'Moment'):
+        self.moment = moment
+        self._heap = []
+        self._counter = it.count()
+        self._timer = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    @property
+    def hauto(self):
+        return self.moment.hauto
+
+    @property
+    def next_due(self) -> Optional[float]:
+        """
+        Timestamp of the earliest due Intent, if there is one.
+        """
+        return self._heap[0][0] if self._heap else None
+
+    def add(self, intent: 'Intent', schedule: Schedule) -> None:
+        """
+        Schedule an Intent.
+        """
+        when = schedule.first(self.moment.now())
+
+        if when is None:
+            return
+
+        entry = self._push(when, intent, schedule)
+
+        # only re-arm if the new Intent is due before everything else
+        if self._heap[0] is entry:
+            self._arm()
+
+    def _push(self, when: pendulum.DateTime, intent: 'Intent', schedule: Schedule) -> tuple:
+        entry = (when.timestamp(), next(self._counter), intent, schedule)
+        heapq.heappush(self._heap, entry)
+        return entry
+
+    def _pop_due(self, now: pendulum.DateTime) -> Tuple[Tuple[pendulum.DateTime, 'Intent'], ...]:
+        """
+        Remove all due Intents from the heap, rescheduling recurring ones.
+        """
+        due = []
+        deadline = now.timestamp() + self._TOLERANCE
+
+        while self._heap and self._heap[0][0] <= deadline:
+            ts, _, intent, schedule = heapq.heappop(self._heap)
+
+            if intent._state == IntentState.cancelled:
+                continue
+
+            when = pendulum.from_timestamp(ts, tz='UTC')
+            due.append((when, intent))
+
+            if intent.runs + 1 >= intent.limit > 0:
+                continue
+
+            nxt = schedule.next(when, now)
+
+            if nxt is not None:
+                self._push(nxt, intent, schedule)
+
+        return tuple(due)
+
+    def _arm(self) -> None:
+        """
+        Set the timer for the next due Intent.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._heap or not self.hauto.is_ready or self.moment.simulate:
+            return
+
+        remaining = self._heap[0][0] - self.moment.now().timestamp()
+        delay = max(0, self.moment.scale_time(remaining, to='realtime'))
+        loop = self.hauto.loop
+        self._timer = loop.call_at(loop.time() + delay, self._run_due)
+
+    def fire_due(self, now: pendulum.DateTime) -> List[asyncio.Task]:
+        """
+        Fire all Intents which are due at <now>.
+        """
+        tasks = []
+
+        for when, intent in self._pop_due(now):
+            tasks.extend(
+                self.hauto.bus.dispatch(
+                    EVT_TIME_SCHEDULED, (intent,), parent=self.moment.api_name, scheduled_for=when
+                )
+            )
+
+        return tasks
+
+    def _run_due(self) -> None:
+        """
+        Timer callback, fire all due Intents and re-arm.
+        """
+        self._timer = None
+
+        if not self.hauto.is_ready:
+            return
+
+        self.fire_due(self.moment.now())
+        self._arm()
+
+    def start(self) -> None:
+        """
+        Begin firing scheduled Intents.
+        """
+        self._arm()
+
+    def stop(self) -> None:
+        """
+        Stop firing scheduled Intents.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
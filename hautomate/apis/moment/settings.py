@@ -17,7 +17,11 @@ class Config(Settings):
 
     epoch : pendulum.DateTime = None
       start of the virtual clock, default is None, to mean no initial skew
+
+    simulate : bool = False
+      run the virtual clock as a discrete-event simulation, see Moment.advance
     """
     resolution: float = 1.0
     speed: float = 1.0
     epoch: pendulum.DateTime = None
+    simulate: bool = False
@@ -1,8 +1,8 @@
 from typing import Callable, Tuple
 import collections
 import asyncio
-import re
 
+from hautomate.util.pattern import EventPattern
 from hautomate.util.async_ import safe_sync
 from hautomate.context import Context
 from hautomate.events import _META_EVENTS, EVT_ANY
@@ -11,6 +11,9 @@ from hautomate.check import Check
 from hautomate.api import API, api_method, public_method
 
 
+_NEVER = Check(lambda ctx: False)
+
+
 class Trigger(API):
     """
     API for working with messages broadcast across the event bus.
@@ -64,7 +67,17 @@ class Trigger(API):
 
         The context under which the event waited for will be returned.
         """
-        fut = self._event_waiters[event_name.upper()]
+        event = event_name.upper()
+        first = event not in self._event_waiters
+        fut = self._event_waiters[event]
+
+        # the catch-all listener does the work, even for an event fired before
+        # this runs, but subscribing to the event itself lets other APIs know
+        # that someone is interested in it; that Intent never runs
+        if first:
+            interest = Intent(event, fn=self.almost_any_event, checks=[_NEVER])
+            intent = self.hauto.bus.subscribe(event, interest)
+            fut.add_done_callback(lambda _: intent.cancel())
 
         # shield the future from cancellation if we reach a timeout so we don't
         # interfere with other waiters
@@ -135,7 +148,7 @@ class Trigger(API):
         -------
         intent : Intent
         """
-        return self.re_match(fr'^{part.upper()}.*', fn=fn, **intent_kwargs)
+        return self.re_match(fr'^{part.upper()}.*', fn=fn, subscribe=False, **intent_kwargs)
 
     @api_method
     def endswith(self, part: str, *, fn: Callable, **intent_kwargs) -> Intent:
@@ -156,7 +169,7 @@ class Trigger(API):
         -------
         intent : Intent
         """
-        return self.re_match(fr'.*{part.upper()}$', fn=fn, **intent_kwargs)
+        return self.re_match(fr'.*{part.upper()}$', fn=fn, subscribe=False, **intent_kwargs)
 
     @api_method
     def contains(self, mid: str, *, fn: Callable, **intent_kwargs) -> Intent:
@@ -177,7 +190,7 @@ class Trigger(API):
         -------
         intent : Intent
         """
-        return self.re_match(fr'.*{mid.upper()}.*', fn=fn, **intent_kwargs)
+        return self.re_match(fr'.*{mid.upper()}.*', fn=fn, subscribe=False, **intent_kwargs)
 
     @api_method
     def re_match(
@@ -204,12 +217,7 @@ class Trigger(API):
         -------
         intent : Intent
         """
-        try:
-            intent_kwargs['checks']
-        except KeyError:
-            intent_kwargs['checks'] = []
-
-        pattern = re.compile(fr'{pattern}', flags=re.IGNORECASE)
-        check = Check(lambda ctx: pattern.fullmatch(ctx.event) is not None)
-        intent_kwargs['checks'].append(check)
-        return Intent(EVT_ANY, fn=fn, **intent_kwargs)
+        # the EventBus matches patterns itself, so non-matching events never
+        # reach this Intent at all
+        pattern = EventPattern.from_regex(pattern)
+        return Intent(EVT_ANY, fn=fn, pattern=pattern, **intent_kwargs)
@@ -0,0 +1,217 @@
+from typing import Optional, Dict
+import functools as ft
+import collections
+import asyncio
+import logging
+
+from hautomate.context import Context
+from hautomate.enums import OverflowPolicy
+from hautomate.api import API
+
+
+_log = logging.getLogger(__name__)
+
+
+def _resolve(fut: asyncio.Future, task: asyncio.Task) -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+class AdmissionController:
+    """
+    Gatekeeper which bounds the number of Intents running at once.
+
+    Limits may be placed on all of Hautomate, on each App, and on each
+    Intent. Work which arrives while any of its limits are reached is
+    handled according to an OverflowPolicy:
+
+      QUEUE        wait for capacity, in order of arrival
+      DROP_OLDEST  wait for capacity, but drop the oldest waiting run
+                   when the queue is full
+      DROP_NEWEST  drop the run outright
+      COALESCE     wait for capacity, but keep at most one waiting run
+                   per Intent, with the most recent context
+
+    Listeners belonging to APIs are never limited, as they may be feeding
+    the very work which waits on them.
+    """
+    def __init__(self, hauto):
+        self.hauto = hauto
+        self.config = cfg = hauto.config.backpressure
+        self._capped = any((
+            cfg.max_in_flight, cfg.max_in_flight_per_app, cfg.max_in_flight_per_intent
+        ))
+        self._in_flight = 0
+        self._per_app = collections.Counter()
+        self._per_intent = collections.Counter()
+        self._queue = collections.deque()
+        self._coalescing = {}
+
+        # metrics
+        self.admitted = 0
+        self.queued = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of runs waiting on capacity.
+        """
+        return len(self._queue)
+
+    def _limited(self, intent: 'Intent') -> bool:
+        if not self._capped and intent.max_in_flight is None:
+            return False
+
+        return not isinstance(getattr(intent.func, '__self__', None), API)
+
+    def _has_capacity(self, intent: 'Intent') -> bool:
+        cfg = self.config
+
+        if cfg.max_in_flight is not None and self._in_flight >= cfg.max_in_flight:
+            return False
+
+        app_limit = cfg.max_in_flight_per_app
+
+        if app_limit is not None and intent._app is not None:
+            if self._per_app[intent._app] >= app_limit:
+                return False
+
+        intent_limit = intent.max_in_flight
+
+        if intent_limit is None:
+            intent_limit = cfg.max_in_flight_per_intent
+
+        if intent_limit is not None and self._per_intent[intent] >= intent_limit:
+            return False
+
+        return True
+
+    def _start(self, ctx: Context, intent: 'Intent') -> asyncio.Task:
+        self._in_flight += 1
+        self._per_intent[intent] += 1
+
+        if intent._app is not None:
+            self._per_app[intent._app] += 1
+
+        self.admitted += 1
+        return asyncio.create_task(self._run(ctx, intent))
+
+    async def _run(self, ctx: Context, intent: 'Intent') -> None:
+        try:
+            await self.hauto._intent_runner(ctx, intent)
+        finally:
+            self._release(intent)
+            self._pump()
+
+    def _release(self, intent: 'Intent') -> None:
+        self._in_flight -= 1
+
+        for counter, key in ((self._per_intent, intent), (self._per_app, intent._app)):
+            if key is None:
+                continue
+
+            counter[key] -= 1
+
+            if counter[key] <= 0:
+                del counter[key]
+
+    def _pump(self) -> None:
+        """
+        Admit as many waiting runs as there is capacity for.
+        """
+        limit = self.config.max_in_flight
+        blocked = collections.deque()
+
+        while self._queue and (limit is None or self._in_flight < limit):
+            entry = self._queue.popleft()
+            ctx, intent, fut = entry
+
+            if not self._has_capacity(intent):
+                blocked.append(entry)
+                continue
+
+            if self._coalescing.get(intent) is entry:
+                del self._coalescing[intent]
+
+            task = self._start(ctx, intent)
+            task.add_done_callback(ft.partial(_resolve, fut))
+
+        blocked.extend(self._queue)
+        self._queue = blocked
+
+    def _drop(self, entry: list) -> None:
+        ctx, intent, fut = entry
+        self.dropped += 1
+        _log.debug(f'dropped run of {intent} for {ctx.event}, over capacity')
+
+        if self._coalescing.get(intent) is entry:
+            del self._coalescing[intent]
+
+        fut.set_result(None)
+
+    def _overflow(self, ctx: Context, intent: 'Intent') -> Optional[asyncio.Future]:
+        """
+        Handle a run which arrived while at capacity.
+        """
+        policy = intent.overflow or self.config.overflow
+
+        if policy == OverflowPolicy.drop_newest:
+            self.dropped += 1
+            _log.debug(f'dropped run of {intent} for {ctx.event}, over capacity')
+            return None
+
+        if policy == OverflowPolicy.coalesce and intent in self._coalescing:
+            entry = self._coalescing[intent]
+            entry[0] = ctx
+            self.coalesced += 1
+            return entry[2]
+
+        if len(self._queue) >= self.config.max_queued:
+            if policy != OverflowPolicy.drop_oldest:
+                self.dropped += 1
+                _log.debug(f'dropped run of {intent} for {ctx.event}, queue is full')
+                return None
+
+            self._drop(self._queue.popleft())
+
+        entry = [ctx, intent, self.hauto.loop.create_future()]
+        self._queue.append(entry)
+        self.queued += 1
+
+        if policy == OverflowPolicy.coalesce:
+            self._coalescing[intent] = entry
+
+        return entry[2]
+
+    def submit(self, ctx: Context, intent: 'Intent') -> Optional[asyncio.Future]:
+        """
+        Run an Intent, subject to the configured limits.
+
+        Returns
+        -------
+        fut : asyncio.Future or None
+          awaitable which resolves once the run completes, or None if the
+          run was dropped
+        """
+        if not self._limited(intent):
+            return asyncio.create_task(self.hauto._intent_runner(ctx, intent))
+
+        if self._has_capacity(intent):
+            return self._start(ctx, intent)
+
+        return self._overflow(ctx, intent)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Snapshot of the admission workload.
+        """
+        return {
+            'in_flight': self._in_flight,
+            'queue_depth': self.queue_depth,
+            'admitted': self.admitted,
+            'queued': self.queued,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+        }
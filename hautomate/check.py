@@ -34,6 +34,9 @@ class Check(Asyncable):
         super().__init__(func, **kw)
 
     def __call__(self, ctx: Context, *a, **kw) -> bool:
+        if self.concurrency == 'potentially_unsafe_sync':
+            kw['executor'] = ctx.hauto.executors.for_intent(ctx.target)
+
         return super().__call__(ctx, *a, loop=ctx.hauto.loop, **kw)
 
     def __str__(self):
@@ -120,7 +123,7 @@ class Debounce(Cooldown):
 
         return True
 
-    async def __check_trailing__(self):
+    async def __check_trailing__(self, hauto: 'Hautomate'):
         this_task = asyncio.current_task()
 
         try:
@@ -129,7 +132,7 @@ class Debounce(Cooldown):
             self._trailing_waiter = this_task
 
         try:
-            await asyncio.sleep(self.wait)
+            await hauto.sleep(self.wait)
         except asyncio.CancelledError:
             return False
 
@@ -140,7 +143,7 @@ class Debounce(Cooldown):
             r = self.__check_leading__(ctx.when)
 
         if self.edge == 'TRAILING':
-            r = await self.__check_trailing__()
+            r = await self.__check_trailing__(ctx.hauto)
 
         self.last_seen = ctx.when
         return r
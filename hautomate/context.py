@@ -1,10 +1,96 @@
-from typing import Union, Dict
-import itertools as it
+from typing import Union, Mapping, MutableMapping, Iterator, Any
+from types import MappingProxyType
+import time
 
 import pendulum
 
 
-_context_id = it.count()
+class EventRecord:
+    """
+    Immutable description of a single event fire.
+
+    A record is shared between the Contexts of every Intent which runs as
+    part of the same fire, rather than each of them copying it.
+    """
+    __slots__ = ('hauto', 'event', 'event_data', 'parent', 'when_ts', 'created_ts', '_when')
+
+    def __init__(
+        self,
+        hauto: 'Hautomate',
+        event: str,
+        *,
+        event_data: Mapping,
+        when: Union[pendulum.DateTime, float],
+        parent: Union['Intent', 'Hautomate']
+    ):
+        if not isinstance(event_data, MappingProxyType):
+            event_data = MappingProxyType(event_data)
+
+        try:
+            when = when.timestamp()
+        except AttributeError:
+            pass
+
+        self.hauto = hauto
+        self.event = event
+        self.event_data = event_data
+        self.parent = parent
+        self.when_ts = when
+        self.created_ts = time.time()
+        self._when = None
+
+    @property
+    def when(self) -> pendulum.DateTime:
+        """
+        Datetime of the fire, only materialized on first access.
+        """
+        if self._when is None:
+            self._when = pendulum.from_timestamp(self.when_ts, tz='UTC')
+
+        return self._when
+
+
+class EventData(MutableMapping):
+    """
+    Payload of an event, as seen by a single Context.
+
+    Reads go straight to the payload shared by every Context of the fire.
+    The first write takes a private copy, so an Intent may change its own
+    event_data without the change leaking into that of any other.
+    """
+    __slots__ = ('_data', '_owned')
+
+    def __init__(self, shared: Mapping):
+        self._data = shared
+        self._owned = False
+
+    def _own(self) -> None:
+        if not self._owned:
+            self._data = dict(self._data)
+            self._owned = True
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._own()
+        self._data[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        self._own()
+        del self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __repr__(self) -> str:
+        return repr(dict(self._data))
 
 
 class Context:
@@ -14,31 +100,66 @@ class Context:
     Contexts hold a lot of relevant information as to why a specific intent was
     triggered.
     """
+    __slots__ = ('_record', 'target', '_event_data')
+
     def __init__(
         self,
         hauto: 'Hautomate',
         event: str,
         *,
-        event_data: Dict,
+        event_data: Mapping,
         target: 'Intent',
         when: pendulum.DateTime,
         parent: Union['Intent', 'Hautomate']
     ):
-        self._id = next(_context_id)
-        self._hauto = hauto
-        self.event = event
-        self.event_data = event_data
+        self._record = EventRecord(hauto, event, event_data=event_data, when=when, parent=parent)
         self.target = target
-        self.parent = parent
-        self._when_ts = when.in_timezone('UTC').timestamp()
-        self._created_ts = pendulum.now(tz='UTC').timestamp()
+        self._event_data = None
+
+    @classmethod
+    def from_record(cls, record: EventRecord, target: 'Intent') -> 'Context':
+        """
+        Build a Context for <target> on top of an existing EventRecord.
+        """
+        ctx = cls.__new__(cls)
+        ctx._record = record
+        ctx.target = target
+        ctx._event_data = None
+        return ctx
 
     @property
     def hauto(self):
         """
         Grab a reference to Hautomate.
         """
-        return self._hauto
+        return self._record.hauto
+
+    @property
+    def event(self) -> str:
+        """
+        Name of the event which was fired.
+        """
+        return self._record.event
+
+    @property
+    def event_data(self) -> EventData:
+        """
+        Payload of the event which was fired.
+
+        Changes are private to this Context, the payload seen by other
+        Intents of the same fire is left as it was.
+        """
+        if self._event_data is None:
+            self._event_data = EventData(self._record.event_data)
+
+        return self._event_data
+
+    @property
+    def parent(self) -> Union['Intent', 'Hautomate']:
+        """
+        Source of the event which was fired.
+        """
+        return self._record.parent
 
     @property
     def when(self) -> Union[pendulum.DateTime, None]:
@@ -47,14 +168,14 @@ class Context:
 
         Typically, this is when the Intent fires.
         """
-        return pendulum.from_timestamp(self._when_ts, tz='UTC')#.in_timezone(self.hauto.config.timezone)
+        return self._record.when
 
     @property
     def created_at(self) -> pendulum.DateTime:
         """
         Datetime when the Context was created.
         """
-        return pendulum.from_timestamp(self._created_ts, tz='UTC')#.in_timezone(self.hauto.config.timezone)
+        return pendulum.from_timestamp(self._record.created_ts, tz='UTC')
 
     def asdict(self):
         d = {
@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Iterable, Optional, Union, Tuple, List, Dict, Set
 from asyncio import AbstractEventLoop
 import collections
 import asyncio
@@ -6,22 +6,29 @@ import logging
 
 import pendulum
 
+from hautomate.util.pattern import EventPattern, PatternIndex
 from hautomate.settings import HautoConfig
-from hautomate.context import Context
+from hautomate.context import Context, EventRecord
 from hautomate.intent import Intent
 from hautomate.events import (
     _META_EVENTS, _EVT_INIT, EVT_START, EVT_READY, EVT_STOP, EVT_CLOSE,
-    EVT_INTENT_SUBSCRIBE, EVT_INTENT_START, EVT_INTENT_END,
+    EVT_INTENT_SUBSCRIBE, EVT_INTENT_UNSUBSCRIBE, EVT_INTENT_START, EVT_INTENT_END,
     EVT_ANY
 )
+from hautomate.backpressure import AdmissionController
+from hautomate.executor import ExecutorRegistry
 from hautomate.enums import CoreState
-from hautomate.api import APIRegistry
+from hautomate.api import API, APIRegistry
 from hautomate.app import AppRegistry
 
 
 _log = logging.getLogger(__name__)
 
 
+def _is_api_listener(intent: Intent) -> bool:
+    return isinstance(getattr(intent.func, '__self__', None), API)
+
+
 class Hautomate:
     """
     Core orchestrator for the automation environment.
@@ -31,6 +38,8 @@ class Hautomate:
         self.loop = loop or asyncio.get_event_loop()
         self.config = config
         self.bus = EventBus(self)
+        self.executors = ExecutorRegistry(self)
+        self.admission = AdmissionController(self)
         self.apis = APIRegistry(self)
         self.apps = AppRegistry(self)
         self._stopped = asyncio.Event(loop=self.loop)
@@ -60,8 +69,37 @@ class Hautomate:
 
         return self.apis.moment.now()
 
+    async def sleep(self, seconds: float) -> None:
+        """
+        Sleep for an amount of Hautomate's time.
+
+        Once ready, this follows the Moment API's virtual clock.
+        """
+        if not self.is_ready:
+            await asyncio.sleep(seconds)
+            return
+
+        await self.apis.moment.sleep(seconds)
+
     #
 
+    async def _notify(self, event: str, **event_data) -> None:
+        """
+        Fire a meta event which describes Intent execution.
+
+        This costs nothing if nobody listens. Otherwise, listeners are
+        run alongside the Intent, unless configured to be awaited.
+        """
+        intents = self.bus.candidates(event)
+
+        if not intents:
+            return
+
+        tasks = self.bus.dispatch(event, intents, parent=self, **event_data)
+
+        if self.config.await_meta_events:
+            await asyncio.wait(tasks)
+
     async def _intent_runner(self, ctx: Context, intent: Intent):
         """
         Wrapper around Intent execution.
@@ -73,8 +111,10 @@ class Hautomate:
             return
 
         # don't fire meta events during startup/shutdown
-        if ctx.event not in _META_EVENTS and self.is_ready:
-            await self.bus.fire(EVT_INTENT_START, parent=self, wait='ALL_COMPLETED', started_intent=intent)
+        notify = ctx.event not in _META_EVENTS and self.is_ready
+
+        if notify:
+            await self._notify(EVT_INTENT_START, started_intent=intent)
 
         try:
             await intent(ctx)
@@ -86,9 +126,8 @@ class Hautomate:
             #     await intent.parent.on_intent_error(ctx, error=exc)
         finally:
 
-            # don't fire meta events during startup/shutdown
-            if ctx.event not in _META_EVENTS and self.is_ready:
-                await self.bus.fire(EVT_INTENT_END, parent=self, wait='ALL_COMPLETED', ended_intent=intent)
+            if notify and self.is_ready:
+                await self._notify(EVT_INTENT_END, ended_intent=intent)
 
     #
 
@@ -123,6 +162,7 @@ class Hautomate:
         self._state = CoreState.stopped
         self._stopped.set()
         await self.bus.fire(EVT_STOP, parent=self, wait='ALL_COMPLETED')
+        self.executors.shutdown()
 
 
 class EventBus:
@@ -131,10 +171,60 @@ class EventBus:
 
     The EventBus is responsible for communicating events throughout the
     Hautomate platform. Events are consumed in a pub-sub architecture.
+
+    Candidate Intents for each event name are compiled into an immutable
+    dispatch index on first fire, and invalidated whenever a
+    subscription is added or removed. This keeps the hot path of firing
+    an event down to a single dictionary lookup.
+
+    Intents which carry an EventPattern are held in a PatternIndex, and
+    are only considered when compiling the index for a new event name.
     """
     def __init__(self, hauto: 'Hautomate'):
         self.hauto = hauto
         self._events = collections.defaultdict(list)
+        self._patterns = PatternIndex()
+        self._dispatch_index = {}
+
+    def _invalidate(self, event: str, *, pattern: EventPattern=None) -> None:
+        """
+        Drop compiled dispatch entries affected by a change to <event>.
+        """
+        if pattern is not None:
+            for name in [n for n in self._dispatch_index if pattern.matches(n)]:
+                del self._dispatch_index[name]
+        elif event == EVT_ANY:
+            self._dispatch_index.clear()
+        else:
+            self._dispatch_index.pop(event, None)
+
+    def _compile(self, event: str) -> tuple:
+        """
+        Build the candidate Intents for <event>.
+        """
+        candidates = []
+
+        if event not in _META_EVENTS:
+            candidates.extend(self._events.get(EVT_ANY, ()))
+
+            if self._patterns:
+                candidates.extend(self._patterns.match(event))
+
+        candidates.extend(self._events.get(event, ()))
+
+        # preserve subscription order, but only fire an Intent once per event
+        intents = tuple(dict.fromkeys(candidates))
+        self._dispatch_index[event] = intents
+        return intents
+
+    def candidates(self, event: str) -> tuple:
+        """
+        Return all Intents which would receive <event>.
+        """
+        try:
+            return self._dispatch_index[event]
+        except KeyError:
+            return self._compile(event)
 
     def subscribe(self, event: str, intent: Intent):
         """
@@ -143,7 +233,14 @@ class EventBus:
         if not isinstance(intent, Intent):
             intent = Intent(event, intent)
 
-        self._events[intent.event].append(intent)
+        intent._bus = self
+
+        if intent.pattern is not None:
+            self._patterns.add(intent.pattern, intent)
+        else:
+            self._events[intent.event].append(intent)
+
+        self._invalidate(intent.event, pattern=intent.pattern)
         coro = self.fire(EVT_INTENT_SUBSCRIBE, parent=self.hauto, created_intent=intent)
 
         if not self.hauto.is_ready:
@@ -153,6 +250,47 @@ class EventBus:
 
         return intent
 
+    def unsubscribe(self, intent: Intent) -> None:
+        """
+        Remove an Intent from the registry.
+        """
+        try:
+            if intent.pattern is not None:
+                self._patterns.remove(intent.pattern, intent)
+            else:
+                self._events[intent.event].remove(intent)
+        except (KeyError, ValueError):
+            return
+
+        if not self._events.get(intent.event, True):
+            del self._events[intent.event]
+
+        self._invalidate(intent.event, pattern=intent.pattern)
+        listeners = self.candidates(EVT_INTENT_UNSUBSCRIBE)
+
+        if listeners:
+            self.dispatch(EVT_INTENT_UNSUBSCRIBE, listeners, parent=self.hauto, removed_intent=intent)
+
+    def subscribed(self) -> Optional[Set[str]]:
+        """
+        Return the names of all events which have subscribers.
+
+        If any Intent listens for every event, or for a pattern which is
+        more than a list of names, there is no finite set of names and None
+        is returned instead. The catch-all listeners of APIs don't count.
+        """
+        # APIs listening to everything are plumbing, rather than interest
+        if any(not _is_api_listener(intent) for intent in self._events.get(EVT_ANY, ())):
+            return None
+
+        literals = self._patterns.literals()
+
+        if literals is None:
+            return None
+
+        # the catch-all key isn't the name of an event
+        return {name for name in (*self._events, *literals) if name != EVT_ANY}
+
     async def fire(
         self,
         event: str,
@@ -180,35 +318,144 @@ class EventBus:
         done, pending : set[Intents, ...]
         """
         event = event.upper()
-        intents = set()
+        intents = self.candidates(event)
 
-        if event not in _META_EVENTS:
-            intents.update(self._events[EVT_ANY])
+        if not intents:
+            return set(), set()
 
-        if event in self._events:
-            intents.update(self._events[event])
-
-        ctx_data = {
-            'hauto': self.hauto,
-            'event': event,
-            'event_data': event_data,
-            # 'target': <filled below>,
-            'when': self.hauto.now,
-            'parent': parent if parent is not None else self.hauto,
-        }
-
-        tasks = []
-
-        for intent in intents:
-            ctx = Context(**ctx_data, target=intent)
-            wrapped = self.hauto._intent_runner(ctx, intent)
-            task = asyncio.create_task(wrapped)
-            tasks.append(task)
+        tasks = self.dispatch(event, intents, parent=parent, **event_data)
 
         if tasks and (wait is not None):
             done, pending = await asyncio.wait(tasks, return_when=wait)
         else:
             done = set()
-            pending = intents
+            pending = set(intents)
 
         return done, pending
+
+    async def fire_many(
+        self,
+        events: Iterable[Tuple[str, Dict]],
+        *,
+        parent: Union[Intent, Hautomate],
+        chunk_size: int=256,
+        wait: bool=False
+    ) -> int:
+        """
+        Fire a burst of events at the registry, in order.
+
+        Candidate Intents are resolved once per distinct event name. Work
+        is scheduled in chunks, so that no more than <chunk_size> Intents
+        are ever in flight at once. This bounds the number of Tasks alive
+        during an event storm. The Intents of one event are never split up,
+        so an event with more than <chunk_size> candidates runs alone.
+
+        Parameters
+        ----------
+        events : Iterable[(str, dict)]
+            pairs of event name and event data
+
+        parent : Intent or Hautomate
+            source of the event triggers
+
+        chunk_size : int = 256
+            maximum number of Intents in flight
+
+        wait : bool = False
+            whether or not to wait on the last chunk to complete
+
+        Returns
+        -------
+        fired : int
+            number of Intents which were run, not counting runs dropped
+            by backpressure
+        """
+        if chunk_size < 1:
+            raise ValueError(f"'chunk_size' must be a positive integer, got: {chunk_size}")
+
+        resolved = {}
+        in_flight = set()
+        fired = 0
+
+        for event, event_data in events:
+            try:
+                name, intents = resolved[event]
+            except KeyError:
+                name = event.upper()
+                intents = self.candidates(name)
+                resolved[event] = (name, intents)
+
+            if not intents:
+                continue
+
+            while in_flight and len(in_flight) + len(intents) > chunk_size:
+                _, in_flight = await asyncio.wait(in_flight, return_when='FIRST_COMPLETED')
+
+            tasks = self.dispatch(name, intents, parent=parent, **event_data)
+            in_flight.update(tasks)
+            fired += len(tasks)
+
+        if wait and in_flight:
+            await asyncio.wait(in_flight)
+
+        return fired
+
+    def dispatch(
+        self,
+        event: str,
+        intents: Iterable[Intent],
+        *,
+        parent: Union[Intent, Hautomate],
+        **event_data
+    ) -> List[asyncio.Future]:
+        """
+        Run a known set of Intents for an event.
+
+        Unlike fire, this bypasses the subscription index entirely. It
+        is meant for APIs which keep their own, more specific, index of
+        Intents to run.
+
+        Runs for non-meta events are subject to backpressure, and so may
+        be queued or dropped if Hautomate is at capacity.
+
+        Parameters
+        ----------
+        event : str
+            name of trigger event
+
+        intents : Iterable[Intent]
+            intents to run
+
+        parent : Intent or Hautomate
+            source of the event trigger
+
+        Returns
+        -------
+        tasks : list[asyncio.Future, ...]
+        """
+        record = EventRecord(
+            self.hauto,
+            event,
+            event_data=event_data,
+            when=self.hauto.now,
+            parent=parent if parent is not None else self.hauto
+        )
+
+        tasks = []
+
+        if event in _META_EVENTS:
+            for intent in intents:
+                ctx = Context.from_record(record, intent)
+                tasks.append(asyncio.create_task(self.hauto._intent_runner(ctx, intent)))
+
+            return tasks
+
+        submit = self.hauto.admission.submit
+
+        for intent in intents:
+            task = submit(Context.from_record(record, intent), intent)
+
+            if task is not None:
+                tasks.append(task)
+
+        return tasks
@@ -22,3 +22,13 @@ class IntentState(enum.Enum):
     ready = 'READY'
     paused = 'PAUSED'
     cancelled = 'CANCELLED'
+
+
+class OverflowPolicy(enum.Enum):
+    """
+    Represent what happens to work which arrives while at capacity.
+    """
+    queue = 'QUEUE'
+    drop_oldest = 'DROP_OLDEST'
+    drop_newest = 'DROP_NEWEST'
+    coalesce = 'COALESCE'
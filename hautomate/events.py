@@ -7,6 +7,7 @@ EVT_STOP  = 'STOP'
 EVT_APP_LOAD = 'APP_LOAD'
 EVT_APP_UNLOAD = 'APP_UNLOAD'
 EVT_INTENT_SUBSCRIBE = 'INTENT_SUBSCRIBE'
+EVT_INTENT_UNSUBSCRIBE = 'INTENT_UNSUBSCRIBE'
 EVT_INTENT_START = 'INTENT_START'
 EVT_INTENT_END = 'INTENT_END'
 
@@ -14,5 +15,5 @@ EVT_ANY = '*'
 
 _META_EVENTS = (
     _EVT_INIT, EVT_APP_LOAD, EVT_APP_UNLOAD,
-    EVT_INTENT_SUBSCRIBE, EVT_INTENT_START, EVT_INTENT_END
+    EVT_INTENT_SUBSCRIBE, EVT_INTENT_UNSUBSCRIBE, EVT_INTENT_START, EVT_INTENT_END
 )
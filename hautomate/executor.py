@@ -0,0 +1,163 @@
+from typing import Callable, Dict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import functools as ft
+import threading
+import asyncio
+import logging
+
+from hautomate.errors import HautoError
+
+
+_log = logging.getLogger(__name__)
+_SHARED = 'hautomate'
+
+
+class MeteredThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    A named ThreadPoolExecutor which keeps track of its workload.
+
+    Parameters
+    ----------
+    name : str
+      name of the pool, also used as the prefix of its worker threads
+
+    max_workers : int = None
+      maximum number of threads in the pool
+    """
+    def __init__(self, name: str, *, max_workers: int=None):
+        super().__init__(max_workers=max_workers, thread_name_prefix=f'hauto-{name}')
+        self.name = name
+        self._metrics_lock = threading.Lock()
+        self.submitted = 0
+        self.running = 0
+        self.completed = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of work items waiting on a free thread.
+        """
+        return self._work_queue.qsize()
+
+    def _metered(self, fn: Callable, *a, **kw):
+        with self._metrics_lock:
+            self.running += 1
+
+        try:
+            return fn(*a, **kw)
+        finally:
+            with self._metrics_lock:
+                self.running -= 1
+                self.completed += 1
+
+    def submit(self, fn: Callable, *a, **kw):
+        with self._metrics_lock:
+            self.submitted += 1
+
+        return super().submit(self._metered, fn, *a, **kw)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Snapshot of the pool's workload.
+        """
+        return {
+            'max_workers': self._max_workers,
+            'queued': self.queue_depth,
+            'running': self.running,
+            'submitted': self.submitted,
+            'completed': self.completed,
+        }
+
+    def __repr__(self):
+        return f'<MeteredThreadPoolExecutor {self.name}, max_workers={self._max_workers}>'
+
+
+class ExecutorRegistry:
+    """
+    A registry of thread pools for potentially_unsafe_sync work.
+
+    By default, all of Hautomate shares a single pool. If executor
+    isolation is configured, each App and API will lazily receive a
+    pool of its own the first time it needs to run blocking code.
+    """
+    def __init__(self, hauto):
+        self.hauto = hauto
+        self.config = hauto.config.executor
+        self._pools = {}
+        self._process_pool = None
+
+    @property
+    def names(self) -> list:
+        """
+        Return an iterable of pool-names.
+        """
+        return list(self._pools.keys())
+
+    def get(self, name: str=_SHARED) -> MeteredThreadPoolExecutor:
+        """
+        Retrieve the pool for <name>, creating it if necessary.
+
+        If isolation is not configured, the shared pool is returned.
+        """
+        if not self.config.isolate:
+            name = _SHARED
+
+        try:
+            return self._pools[name]
+        except KeyError:
+            _log.debug(f"creating thread pool '{name}'")
+            pool = MeteredThreadPoolExecutor(name, max_workers=self.config.max_workers)
+            self._pools[name] = pool
+            return pool
+
+    def for_intent(self, intent: 'Intent') -> MeteredThreadPoolExecutor:
+        """
+        Retrieve the pool which is responsible for <intent>.
+        """
+        if not self.config.isolate:
+            return self.get()
+
+        app = getattr(intent, '_app', None)
+
+        if app is not None:
+            return self.get(app.name)
+
+        owner = getattr(getattr(intent, 'func', None), '__self__', None)
+        return self.get(getattr(owner, 'api_name', _SHARED))
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Snapshot of the workload of all pools.
+        """
+        return {name: pool.stats() for name, pool in self._pools.items()}
+
+    async def run_in_process(self, fn: Callable, *a, **kw):
+        """
+        Offload CPU-heavy work to a separate process.
+
+        Both <fn> and its arguments must be picklable, so this is best
+        used from within an Intent on plain data, not on the Context.
+        """
+        if not self.config.process_workers:
+            raise HautoError(
+                'the process pool is disabled, set executor.process_workers in your '
+                'configuration to enable it'
+            )
+
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.config.process_workers)
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._process_pool, ft.partial(fn, *a, **kw))
+
+    def shutdown(self, *, wait: bool=False) -> None:
+        """
+        Shutdown all pools.
+        """
+        pools = [*self._pools.values(), self._process_pool]
+
+        for pool in filter(None, pools):
+            pool.shutdown(wait=wait)
+
+        self._pools.clear()
+        self._process_pool = None
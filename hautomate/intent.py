@@ -3,9 +3,10 @@ import itertools as it
 import warnings
 import asyncio
 
+from hautomate.util.pattern import EventPattern
 from hautomate.util.async_ import Asyncable
 from hautomate.context import Context
-from hautomate.enums import IntentState
+from hautomate.enums import IntentState, OverflowPolicy
 from hautomate.check import Cooldown
 from hautomate.app import App
 
@@ -20,8 +21,21 @@ class Intent(Asyncable):
     Intents are the core building block of Hautomate. They are callable
     items similar to asyncio's Task, in that they hold an internal state
     and represent work that will be done in the future.
+
+    An Intent may optionally carry an EventPattern, in which case the
+    EventBus will deliver any non-meta event whose name matches it.
     """
-    def __init__(self, event: str, fn: Callable, *, checks: list=None, limit: int=-1):
+    def __init__(
+        self,
+        event: str,
+        fn: Callable,
+        *,
+        checks: list=None,
+        limit: int=-1,
+        pattern: EventPattern=None,
+        max_in_flight: int=None,
+        overflow: str=None
+    ):
         super().__init__(fn)
 
         try:
@@ -35,10 +49,14 @@ class Intent(Asyncable):
 
         self._id = next(_intent_id)
         self.event = event.upper()
+        self.pattern = pattern
         self.checks = checks
         self.cooldown = cooldown
         self.limit = limit
+        self.max_in_flight = max_in_flight
+        self.overflow = OverflowPolicy(overflow.upper()) if overflow is not None else None
         self._app = None
+        self._bus = None
         self._state = IntentState.initialized
 
         # internal statistics
@@ -62,10 +80,14 @@ class Intent(Asyncable):
         """
         Permanently cancel the Intent.
 
-        A cancelled Intent will not fire.
+        A cancelled Intent will not fire, and is removed from the
+        EventBus it was subscribed to.
         """
         self._state = IntentState.cancelled
 
+        if self._bus is not None:
+            self._bus.unsubscribe(self)
+
     def pause(self):
         """
         Set the Intent to paused.
@@ -107,13 +129,23 @@ class Intent(Asyncable):
         """
         Determine if this Intent passes its checks.
 
-        The list of checks is scheduled concurrently, but evaluated
-        eagerly. This allows the Intent to fail fast in case of a long
-        line of checks. Only once all checks have passed, the cooldown
-        is evaluated - which keeps the cooldown from being evaluated if
-        the Intent isn't meant to run in the first place.
+        Checks are evaluated in two phases. Those marked safe_sync are
+        run inline first, failing fast without ever touching the event
+        loop. The remaining checks are then scheduled concurrently, but
+        evaluated eagerly. This allows the Intent to fail fast in case
+        of a long line of checks. Only once all checks have passed, the
+        cooldown is evaluated - which keeps the cooldown from being
+        evaluated if the Intent isn't meant to run in the first place.
         """
-        pending = [check(ctx) for check in self.checks]
+        deferred = []
+
+        for check in self.checks:
+            if check.concurrency != 'safe_sync':
+                deferred.append(check)
+            elif not check.func(ctx):
+                return False
+
+        pending = [check(ctx) for check in deferred]
 
         # this is basically asyncio.as_completed, but with the ability to
         # cancel any checks that are still running in the background.
@@ -124,10 +156,13 @@ class Intent(Asyncable):
                 {p.cancel() for p in pending}
                 return False
 
-        if self.cooldown is not None and not await self.cooldown(ctx):
-            return False
+        if self.cooldown is None:
+            return True
 
-        return True
+        if self.cooldown.concurrency == 'safe_sync':
+            return bool(self.cooldown.func(ctx))
+
+        return bool(await self.cooldown(ctx))
 
     async def __runner__(self, ctx: Context, *a, **kw):
         """
@@ -142,6 +177,10 @@ class Intent(Asyncable):
 
         self.runs += 1
         self.last_ran = ctx.hauto.now
+
+        if self.concurrency == 'potentially_unsafe_sync':
+            kw['executor'] = ctx.hauto.executors.for_intent(self)
+
         return await super().__call__(ctx, *a, loop=ctx.hauto.loop, **kw)
 
     __call__ = __runner__
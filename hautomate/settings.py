@@ -1,4 +1,4 @@
-from typing import Union, Dict
+from typing import Optional, Union, Dict
 import importlib
 import logging
 
@@ -7,6 +7,8 @@ from pydantic import BaseModel, validator
 import pendulum
 import pydantic
 
+from hautomate.enums import OverflowPolicy
+
 
 _log = logging.getLogger(__name__)
 
@@ -17,6 +19,82 @@ class Settings(BaseModel):
     """
 
 
+class ExecutorConfig(Settings):
+    """
+    Validator to ensure proper executor configuration.
+
+    max_workers
+        maximum number of threads in each pool, by default this is left up to
+        concurrent.futures to decide.
+
+    isolate
+        give every App and API its own thread pool, rather than sharing a single one
+        across all of Hautomate. This keeps one slow App from starving the others.
+
+    process_workers
+        size of the process pool available to executors.run_in_process, 0 disables it
+    """
+    max_workers: Optional[int] = None
+    isolate: bool = False
+    process_workers: int = 0
+
+    @validator('max_workers')
+    def _positive(cls, value):
+        if value is not None and value < 1:
+            raise ValueError(f'must be a positive integer, got {value}')
+
+        return value
+
+    @validator('process_workers')
+    def _non_negative(cls, value):
+        if value < 0:
+            raise ValueError(f'must be a non-negative integer, got {value}')
+
+        return value
+
+
+class BackpressureConfig(Settings):
+    """
+    Validator to ensure proper backpressure configuration.
+
+    max_in_flight
+        maximum number of Intents running at once across all of Hautomate
+
+    max_in_flight_per_app
+        maximum number of Intents running at once for each App
+
+    max_in_flight_per_intent
+        maximum number of concurrent runs of each Intent, individual Intents may
+        override this with their own max_in_flight
+
+    max_queued
+        maximum number of runs waiting on capacity, beyond this work is dropped
+
+    overflow
+        what to do with work which arrives while at capacity, one of QUEUE,
+        DROP_OLDEST, DROP_NEWEST, or COALESCE
+    """
+    max_in_flight: Optional[int] = None
+    max_in_flight_per_app: Optional[int] = None
+    max_in_flight_per_intent: Optional[int] = None
+    max_queued: int = 10_000
+    overflow: OverflowPolicy = OverflowPolicy.queue
+
+    @validator('max_in_flight', 'max_in_flight_per_app', 'max_in_flight_per_intent', 'max_queued')
+    def _positive(cls, value):
+        if value is not None and value < 1:
+            raise ValueError(f'must be a positive integer, got {value}')
+
+        return value
+
+    @validator('overflow', pre=True)
+    def _str_upper(cls, enum_candidate):
+        try:
+            return enum_candidate.upper()
+        except AttributeError:
+            return enum_candidate
+
+
 class HautoConfig(Settings):
     """
     Validator to ensure proper Hautomate configuration.
@@ -26,6 +104,16 @@ class HautoConfig(Settings):
         lives as a same-named file (aka /apps_dir/app_name/app_name.py). App files which
         start with either a single- or double-underscore will be ignored.
 
+    executor
+        configuration for the thread pools which run potentially_unsafe_sync Intents
+
+    backpressure
+        limits on the number of Intents which may run at once
+
+    await_meta_events
+        wait for INTENT_START and INTENT_END listeners to complete, rather than running
+        them alongside the Intent they describe
+
     Tools:
       https://www.freemaptools.com/elevation-finder.htm
     """
@@ -34,6 +122,9 @@ class HautoConfig(Settings):
     longitude: float
     elevation: float
     timezone: pendulum._Timezone
+    executor: ExecutorConfig = ExecutorConfig()
+    backpressure: BackpressureConfig = BackpressureConfig()
+    await_meta_events: bool = False
     api_configs: Dict[str, Union[Settings, None]] = {
         'trigger': {},
         'moment': {}
@@ -1,6 +1,8 @@
 from typing import Callable, Awaitable
+from concurrent.futures import Executor
 import functools as ft
 import threading
+import weakref
 import asyncio
 import logging
 
@@ -8,11 +10,17 @@ import logging
 _log = logging.getLogger(__name__)
 
 
+# Classification of a callable's concurrency never changes, so we remember it for
+# the lifetime of the underlying function.
+_concurrency_cache = weakref.WeakKeyDictionary()
+
+
 def safe_sync(f: Callable) -> Callable:
     """
     Mark a func as safe to run within the event loop.
     """
     f.safe_sync = True
+    _concurrency_cache.pop(getattr(f, '__func__', f), None)
     return f
 
 
@@ -23,16 +31,10 @@ def is_main_thread() -> bool:
     return threading.main_thread() == threading.current_thread()
 
 
-def determine_concurrency(func: Callable) -> str:
+def _classify(func: Callable) -> str:
     """
-    Determine the concurrency paradigm to use, if any.
+    Introspect the concurrency paradigm of an unwrapped callable.
     """
-    while isinstance(func, ft.partial):
-        func = func.func
-
-    if asyncio.iscoroutine(func):
-        return 'coroutine'
-
     if not callable(func):
         raise TypeError(f'"{func}" is not a callable, got {type(func)}')
 
@@ -50,6 +52,72 @@ def determine_concurrency(func: Callable) -> str:
     return 'potentially_unsafe_sync'
 
 
+def determine_concurrency(func: Callable) -> str:
+    """
+    Determine the concurrency paradigm to use, if any.
+
+    Results are cached against the underlying function, so bound
+    methods and partials of the same function are only introspected
+    once.
+    """
+    while isinstance(func, ft.partial):
+        func = func.func
+
+    if asyncio.iscoroutine(func):
+        return 'coroutine'
+
+    # bound methods are created on every attribute access, so key on the function
+    key = getattr(func, '__func__', func)
+
+    try:
+        return _concurrency_cache[key]
+    except (KeyError, TypeError):
+        pass
+
+    concurrency = _classify(func)
+
+    try:
+        _concurrency_cache[key] = concurrency
+    except TypeError:
+        # not weakly referenceable, eg. builtins
+        pass
+
+    return concurrency
+
+
+# Dispatchers for each concurrency paradigm, chosen once when an Asyncable is built.
+#
+#   func, loop, executor, args, kwargs --> Awaitable
+#
+
+def _run_inline(func, loop, executor, a, kw):
+    # run inline and hand back an already-resolved future, awaiting a done
+    # future returns immediately without yielding to the loop
+    awt = loop.create_future()
+
+    try:
+        awt.set_result(func(*a, **kw))
+    except Exception as exc:
+        awt.set_exception(exc)
+
+    return awt
+
+
+def _run_in_executor(func, loop, executor, a, kw):
+    return loop.run_in_executor(executor, ft.partial(func, *a, **kw))
+
+
+def _run_as_task(func, loop, executor, a, kw):
+    return loop.create_task(func(*a, **kw))
+
+
+_DISPATCH = {
+    'safe_sync': _run_inline,
+    'potentially_unsafe_sync': _run_in_executor,
+    'async': _run_as_task,
+}
+
+
 class Asyncable:
     """
     Turn any callable into an async version of itself.
@@ -65,6 +133,12 @@ class Asyncable:
           async - an asynchronous function
           safe_sync - a callback that doesn't do significant IO- or CPU-bound work
           potentially_unsafe_sync - a callback that might block the event loop
+
+    Calling an Asyncable from the main thread always returns an
+    awaitable. A safe_sync callable is run inline, and its awaitable is
+    already resolved by the time it's returned. A potentially_unsafe_sync
+    callable is run in <executor>, or the loop's default executor if
+    none is given.
     """
     def __init__(self, func: Callable, *, concurrency: str=None):
         self.func = func
@@ -77,7 +151,20 @@ class Asyncable:
                 'event loop or supplying the underlying callable'
             )
 
-    def __call_threadsafe__(self, *a, main_loop: asyncio.AbstractEventLoop, **kw):
+        try:
+            self._dispatch = _DISPATCH[self.concurrency]
+        except KeyError:
+            raise ValueError(
+                f'concurrency must be one of {list(_DISPATCH)}, got "{self.concurrency}"'
+            ) from None
+
+    def __call_threadsafe__(
+        self,
+        *a,
+        main_loop: asyncio.AbstractEventLoop,
+        executor: Executor=None,
+        **kw
+    ):
         """
         Threadsafe version of __call__.
 
@@ -97,7 +184,7 @@ class Asyncable:
             # loop.call_soon_threadsafe(loop.run_in_executor, ...) would not work in
             # this case (since you can't await a handle).
             async def _wrapped(func, loop):
-                return await loop.run_in_executor(None, func)
+                return await loop.run_in_executor(executor, func)
 
             func = ft.partial(self.func, *a, **kw)
             coro = _wrapped(func, main_loop)
@@ -107,23 +194,14 @@ class Asyncable:
 
         return asyncio.run_coroutine_threadsafe(coro, main_loop).result()
 
-    def __call__(self, *a, loop: asyncio.AbstractEventLoop=None, **kw) -> Awaitable:
+    def __call__(
+        self,
+        *a,
+        loop: asyncio.AbstractEventLoop=None,
+        executor: Executor=None,
+        **kw
+    ) -> Awaitable:
         if not is_main_thread():
-            return self.__call_threadsafe__(*a, main_loop=loop, **kw)
-
-        loop = asyncio.get_event_loop()
-
-        if self.concurrency == 'safe_sync':
-            async def _wrapped(func, *a, **kw):
-                return func(*a, **kw)
-
-            coro = _wrapped(self.func, *a, **kw)
-            awt = loop.create_task(coro)
-        elif self.concurrency == 'potentially_unsafe_sync':
-            fn = ft.partial(self.func, *a, **kw)
-            awt = loop.run_in_executor(None, fn)
-        else:
-            coro = self.func(*a, **kw)
-            awt = loop.create_task(coro)
+            return self.__call_threadsafe__(*a, main_loop=loop, executor=executor, **kw)
 
-        return awt
+        return self._dispatch(self.func, asyncio.get_event_loop(), executor, a, kw)
@@ -0,0 +1,207 @@
+from typing import Iterable, Optional, List, Tuple, Set
+import re
+
+
+_ITEMS = None  # trie nodes are keyed by character, so None is safe to use
+_PREFIX = re.compile(r'\^?(?P<lit>.*?)\.\*\$?')
+_SUFFIX = re.compile(r'\^?\.\*(?P<lit>.*?)\$?')
+_CONTAINS = re.compile(r'\^?\.\*(?P<lit>.*?)\.\*\$?')
+
+
+def _is_literal(s: str) -> bool:
+    """
+    Determine if a regex fragment only matches itself.
+    """
+    return re.escape(s) == s
+
+
+class _Trie:
+    """
+    A character trie which stores items at the end of each key.
+    """
+    def __init__(self):
+        self._root = {}
+
+    def insert(self, key: str, item: object) -> None:
+        node = self._root
+
+        for char in key:
+            node = node.setdefault(char, {})
+
+        node.setdefault(_ITEMS, []).append(item)
+
+    def remove(self, key: str, item: object) -> None:
+        node = self._root
+
+        for char in key:
+            node = node[char]
+
+        node[_ITEMS].remove(item)
+
+    def prefixes_of(self, s: str) -> Iterable[object]:
+        """
+        Yield all items whose key is a prefix of <s>.
+        """
+        node = self._root
+        yield from node.get(_ITEMS, ())
+
+        for char in s:
+            try:
+                node = node[char]
+            except KeyError:
+                return
+
+            yield from node.get(_ITEMS, ())
+
+
+class EventPattern:
+    """
+    Describe a set of event names.
+
+    Patterns are classified on creation, so the EventBus may index the
+    cheap cases (literals, prefixes, suffixes, substrings) without ever
+    touching the regex engine.
+
+    Attributes
+    ----------
+    kind : str
+        one of LITERAL, PREFIX, SUFFIX, CONTAINS, REGEX
+
+    values : tuple[str]
+        uppercased literals which make up the pattern
+    """
+    def __init__(self, kind: str, *values: Tuple[str], flags: int=re.IGNORECASE):
+        self.kind = kind.upper()
+
+        if self.kind == 'REGEX':
+            self.values = values
+            self._regex = re.compile(values[0], flags=flags)
+        else:
+            self.values = tuple(v.upper() for v in values)
+            self._regex = None
+
+    @classmethod
+    def from_regex(cls, pattern: str) -> 'EventPattern':
+        """
+        Classify a regex pattern.
+        """
+        alternatives = pattern.split('|')
+
+        if all(_is_literal(alt) and alt for alt in alternatives):
+            return cls('LITERAL', *alternatives)
+
+        for kind, form in (('CONTAINS', _CONTAINS), ('PREFIX', _PREFIX), ('SUFFIX', _SUFFIX)):
+            m = form.fullmatch(pattern)
+
+            if m is not None and _is_literal(m.group('lit')):
+                return cls(kind, m.group('lit'))
+
+        return cls('REGEX', pattern)
+
+    def matches(self, name: str) -> bool:
+        """
+        Determine if <name> is described by this pattern.
+        """
+        if self.kind == 'LITERAL':
+            return name in self.values
+
+        value, = self.values
+
+        if self.kind == 'PREFIX':
+            return name.startswith(value)
+
+        if self.kind == 'SUFFIX':
+            return name.endswith(value)
+
+        if self.kind == 'CONTAINS':
+            return value in name
+
+        return self._regex.fullmatch(name) is not None
+
+    def __repr__(self):
+        v = ', '.join(map(repr, self.values))
+        return f'EventPattern({self.kind}, {v})'
+
+
+class PatternIndex:
+    """
+    An index of items subscribed via EventPattern.
+
+    Literal alternations are stored in a hash table, prefixes and
+    suffixes in a pair of tries. Only substrings and true regular
+    expressions are scanned linearly.
+    """
+    def __init__(self):
+        self._literals = {}
+        self._prefixes = _Trie()
+        self._suffixes = _Trie()
+        self._scanned = []
+        self._size = 0
+        self._inexact = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, pattern: EventPattern, item: object) -> None:
+        """
+        Index <item> under <pattern>.
+        """
+        if pattern.kind == 'LITERAL':
+            for value in pattern.values:
+                self._literals.setdefault(value, []).append(item)
+        elif pattern.kind == 'PREFIX':
+            self._prefixes.insert(pattern.values[0], item)
+        elif pattern.kind == 'SUFFIX':
+            self._suffixes.insert(pattern.values[0][::-1], item)
+        else:
+            self._scanned.append((pattern, item))
+
+        if pattern.kind != 'LITERAL':
+            self._inexact += 1
+
+        self._size += 1
+
+    def remove(self, pattern: EventPattern, item: object) -> None:
+        """
+        Remove <item> from the index.
+        """
+        if pattern.kind == 'LITERAL':
+            for value in pattern.values:
+                self._literals[value].remove(item)
+
+                if not self._literals[value]:
+                    del self._literals[value]
+
+        elif pattern.kind == 'PREFIX':
+            self._prefixes.remove(pattern.values[0], item)
+        elif pattern.kind == 'SUFFIX':
+            self._suffixes.remove(pattern.values[0][::-1], item)
+        else:
+            self._scanned.remove((pattern, item))
+
+        if pattern.kind != 'LITERAL':
+            self._inexact -= 1
+
+        self._size -= 1
+
+    def literals(self) -> Optional[Set[str]]:
+        """
+        Return every name matched, or None if the index holds more than literals.
+        """
+        if self._inexact:
+            return None
+
+        return set(self._literals)
+
+    def match(self, name: str) -> List[object]:
+        """
+        Find all items whose pattern describes <name>.
+        """
+        matched = [
+            *self._literals.get(name, ()),
+            *self._prefixes.prefixes_of(name),
+            *self._suffixes.prefixes_of(name[::-1]),
+        ]
+
+        matched.extend(item for pattern, item in self._scanned if pattern.matches(name))
+        return matched
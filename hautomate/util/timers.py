@@ -0,0 +1,75 @@
+from typing import Any, Callable, Hashable, Dict
+import asyncio
+
+
+class KeyedTimers:
+    """
+    A set of one-shot timers, at most one per key.
+
+    Unlike sleeping in a Task, a pending timer is just a handle on the
+    event loop, which makes it cheap to hold one for every entity in a
+    large installation.
+
+    Parameters
+    ----------
+    call_later : Callable = None
+      scheduler with the signature of loop.call_later, default is the
+      running event loop's call_later
+    """
+    def __init__(self, call_later: Callable=None):
+        self._call_later = call_later
+        self._handles: Dict[Hashable, Any] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._handles
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def _fire(self, key: Hashable, callback: Callable, *a) -> None:
+        self._handles.pop(key, None)
+        callback(*a)
+
+    def start(self, key: Hashable, delay: float, callback: Callable, *a) -> bool:
+        """
+        Call <callback> after <delay> seconds, unless <key> is already timed.
+
+        Returns
+        -------
+        started : bool
+          whether or not a new timer was started
+        """
+        if key in self._handles:
+            return False
+
+        call_later = self._call_later or asyncio.get_event_loop().call_later
+        self._handles[key] = call_later(delay, self._fire, key, callback, *a)
+        return True
+
+    def restart(self, key: Hashable, delay: float, callback: Callable, *a) -> None:
+        """
+        Call <callback> after <delay> seconds, replacing any existing timer.
+        """
+        self.cancel(key)
+        self.start(key, delay, callback, *a)
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Stop the timer for <key>, if there is one.
+        """
+        try:
+            handle = self._handles.pop(key)
+        except KeyError:
+            return False
+
+        handle.cancel()
+        return True
+
+    def cancel_all(self) -> None:
+        """
+        Stop all timers.
+        """
+        for handle in self._handles.values():
+            handle.cancel()
+
+        self._handles.clear()
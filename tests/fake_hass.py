@@ -0,0 +1,127 @@
+"""
+A tiny stand-in for Home Assistant's websocket API.
+"""
+import asyncio
+import json
+
+import websockets
+
+
+def state(entity_id: str, value: str, *, updated: str='2020-10-16T12:00:00+00:00', **attrs) -> dict:
+    return {
+        'entity_id': entity_id,
+        'state': value,
+        'attributes': attrs,
+        'last_changed': updated,
+        'last_updated': updated,
+        'context': {'id': '1', 'parent_id': None, 'user_id': None},
+    }
+
+
+class FakeHass:
+    """
+    Serve just enough of the websocket API to exercise HassWebConnector.
+
+    Service calls are answered after <service_delays>[service] seconds, or
+    never if the delay is None. Services in <failing_services> reply with
+    an error.
+    """
+    def __init__(self, states: list=None, *, access_token: str='token'):
+        self.states = {s['entity_id']: s for s in (states or [])}
+        self.access_token = access_token
+        self.received = []
+        self.subscriptions = {}
+        self.service_delays = {}
+        self.failing_services = set()
+        self._server = None
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def __aenter__(self):
+        self._server = await websockets.serve(self._handler, '127.0.0.1', 0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handler(self, ws, path):
+        await ws.send(json.dumps({'type': 'auth_required'}))
+        auth = json.loads(await ws.recv())
+
+        if auth.get('access_token') != self.access_token:
+            await ws.send(json.dumps({'type': 'auth_invalid', 'message': 'bad token'}))
+            return
+
+        await ws.send(json.dumps({'type': 'auth_ok'}))
+        self.subscriptions[ws] = {}
+
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                self.received.append(msg)
+                asyncio.create_task(self._reply(ws, msg))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.subscriptions.pop(ws, None)
+
+    async def _reply(self, ws, msg: dict):
+        result = None
+
+        if msg['type'] == 'get_states':
+            result = list(self.states.values())
+
+        if msg['type'] == 'subscribe_events':
+            self.subscriptions[ws][msg['id']] = msg.get('event_type')
+
+        if msg['type'] == 'unsubscribe_events':
+            self.subscriptions[ws].pop(msg['subscription'], None)
+
+        if msg['type'] == 'call_service':
+            service = f"{msg['domain']}.{msg['service']}"
+            delay = self.service_delays.get(service, 0)
+
+            if delay is None:
+                return
+
+            await asyncio.sleep(delay)
+
+            if service in self.failing_services:
+                error = {'code': 'not_found', 'message': f'Service {service} not found.'}
+                await ws.send(json.dumps({'id': msg['id'], 'type': 'result', 'success': False, 'error': error}))
+                return
+
+            result = {'context': {'id': str(msg['id']), 'parent_id': None, 'user_id': None}}
+
+        await ws.send(json.dumps({'id': msg['id'], 'type': 'result', 'success': True, 'result': result}))
+
+    async def set_state(self, new: dict) -> None:
+        """
+        Change an entity's state, and tell every subscriber.
+        """
+        old = self.states.get(new['entity_id'])
+        self.states[new['entity_id']] = new
+        data = {'entity_id': new['entity_id'], 'old_state': old, 'new_state': new}
+        await self.push_event('state_changed', data)
+
+    async def push_event(self, event_type: str, data: dict) -> None:
+        for ws, subscriptions in list(self.subscriptions.items()):
+            for sub_id, wanted in list(subscriptions.items()):
+                # Home Assistant reads '*' as MATCH_ALL
+                if wanted in (None, '*', event_type):
+                    event = {'event_type': event_type, 'data': data, 'origin': 'LOCAL'}
+                    await ws.send(json.dumps({'id': sub_id, 'type': 'event', 'event': event}))
+
+        await asyncio.sleep(0.05)
+
+    async def drop(self) -> None:
+        """
+        Disconnect every client, as a restart of Home Assistant would.
+        """
+        for ws in list(self.subscriptions):
+            await ws.close(1001)
+
+        self.subscriptions.clear()
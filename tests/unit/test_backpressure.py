@@ -0,0 +1,81 @@
+import asyncio
+
+from ward import test, each
+
+from hautomate.settings import HautoConfig
+from hautomate.intent import Intent
+from hautomate import Hautomate
+
+from tests.fixtures import cfg_data_hauto
+
+
+def _hauto(cfg_data, **backpressure):
+    data = cfg_data.copy()
+    data['backpressure'] = backpressure
+    return Hautomate(HautoConfig(**data))
+
+
+@test('AdmissionController caps in-flight Intents with overflow={overflow}', tags=['unit'])
+async def _(
+    cfg_data=cfg_data_hauto,
+    overflow=each('QUEUE', 'DROP_NEWEST', 'DROP_OLDEST', 'COALESCE'),
+    runs=each(3, 1, 3, 2),
+    dropped=each(14, 18, 14, 0),
+    coalesced=each(0, 0, 0, 16)
+):
+    hauto = _hauto(cfg_data, max_in_flight=2, max_queued=4, overflow=overflow)
+    in_flight = peak = 0
+
+    async def _dummy(ctx):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    intent = hauto.bus.subscribe('DUMMY', Intent('DUMMY', _dummy, max_in_flight=1))
+    hauto.bus.subscribe('DUMMY', lambda ctx: None)
+
+    # the first fire runs both Intents, the rest are over capacity
+    for _ in range(10):
+        await hauto.bus.fire('DUMMY', parent='ward')
+
+    while hauto.admission.stats()['in_flight']:
+        await asyncio.sleep(0.01)
+
+    stats = hauto.admission.stats()
+    assert peak == 1
+    assert intent.runs == runs
+    assert stats['dropped'] == dropped
+    assert stats['coalesced'] == coalesced
+    assert stats['queue_depth'] == 0
+
+
+@test('AdmissionController does not limit meta events or API listeners', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto):
+    hauto = _hauto(cfg_data, max_in_flight=1, overflow='DROP_NEWEST')
+    await hauto.start()
+
+    intent = Intent('DUMMY', lambda ctx: None)
+    assert hauto.admission._limited(intent) is True
+
+    for intent in hauto.bus.candidates('INTENT_SUBSCRIBE'):
+        assert hauto.admission._limited(intent) is False
+
+    await hauto.stop()
+    assert hauto.admission.stats()['dropped'] == 0
+
+
+@test('EventBus.fire_many does not count runs which were dropped', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto):
+    hauto = _hauto(cfg_data, max_in_flight=2, max_queued=4, overflow='DROP_NEWEST')
+
+    async def _dummy(ctx):
+        await asyncio.sleep(0.01)
+
+    hauto.bus.subscribe('DUMMY', Intent('DUMMY', _dummy, max_in_flight=1))
+    fired = await hauto.bus.fire_many([('DUMMY', {})] * 10, parent='ward', wait=True)
+
+    stats = hauto.admission.stats()
+    assert stats['dropped'] > 0
+    assert fired == 10 - stats['dropped']
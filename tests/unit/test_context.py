@@ -1,4 +1,4 @@
-from ward import test, fixture
+from ward import test, fixture, raises
 import pendulum
 
 from hautomate.context import Context
@@ -25,7 +25,29 @@ def contexts(now=now):
 def _(now=now):
     L = Context('HAuto', None, event_data={}, target='Intent', parent='ward.test', when=now)
     R = Context('HAuto', None, event_data={}, target='Intent', parent='ward.test', when=now)
-    assert L.__dict__ != R.__dict__
+    assert L._record is not R._record
+
+
+@test('Contexts of a single fire share one event record', tags=['unit'])
+def _(now=now):
+    L = Context('HAuto', None, event_data={'a': 1}, target='Intent', parent='ward.test', when=now)
+    R = Context.from_record(L._record, 'OtherIntent')
+    assert R.event_data == L.event_data == {'a': 1}
+    assert R.when is L.when
+    assert R.target == 'OtherIntent'
+
+    # changes to event_data stay with the Context which made them
+    L.event_data['a'] = 2
+    L.event_data['b'] = 3
+    assert L.event_data == {'a': 2, 'b': 3}
+    assert R.event_data == {'a': 1}
+    assert L._record.event_data == {'a': 1}
+
+    with raises(TypeError):
+        L._record.event_data['a'] = 2
+
+    with raises(AttributeError):
+        L.some_attribute = 'not allowed'
 
 
 @test('Context.when returns pendulum.DateTime', tags=['unit'])
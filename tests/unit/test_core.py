@@ -66,10 +66,11 @@ async def _(cfg=cfg_hauto):
         hauto.bus.subscribe('DUMMY', lambda ctx, *a, **kw: None)
 
     _, intents = await hauto.bus.fire('DUMMY', parent='ward')
+    assert isinstance(intents, set)
     assert len(intents) == 5
 
     _, intents = await hauto.bus.fire('NULL', parent='ward')
-    assert len(intents) == 0
+    assert intents == set()
 
 
 @test('EventBus waits for Intents to complete', tags=['unit'])
@@ -127,3 +128,124 @@ async def _(cfg=cfg_hauto):
     assert intent_1.runs == 1
     assert intent_2.runs == 1
     assert intent_3.runs == 1
+
+
+@test('EventBus compiles a dispatch index, invalidated on subscribe & cancel', tags=['unit'])
+def _(cfg=cfg_hauto):
+    hauto = Hautomate(cfg)
+    intent_1 = hauto.bus.subscribe('DUMMY', lambda ctx, *a, **kw: None)
+    wildcard = hauto.bus.subscribe('*', lambda ctx, *a, **kw: None)
+
+    assert hauto.bus.candidates('DUMMY') == (wildcard, intent_1)
+    assert hauto.bus.candidates('DUMMY') is hauto.bus.candidates('DUMMY')
+
+    # unknown events do not leave empty subscriptions behind
+    assert hauto.bus.candidates('NULL') == (wildcard,)
+    assert 'NULL' not in hauto.bus._events
+
+    intent_2 = hauto.bus.subscribe('DUMMY', lambda ctx, *a, **kw: None)
+    assert hauto.bus.candidates('DUMMY') == (wildcard, intent_1, intent_2)
+
+    intent_1.cancel()
+    assert hauto.bus.candidates('DUMMY') == (wildcard, intent_2)
+
+    wildcard.cancel()
+    assert hauto.bus.candidates('NULL') == ()
+
+
+@test('Hautomate only notifies on INTENT_START/END when observed', tags=['unit'])
+async def _(cfg=cfg_hauto):
+    hauto = Hautomate(cfg)
+    await hauto.start()
+    dispatched = []
+    dispatch = hauto.bus.dispatch
+
+    def _spy(event, *a, **kw):
+        dispatched.append(event)
+        return dispatch(event, *a, **kw)
+
+    hauto.bus.dispatch = _spy
+    intent = hauto.bus.subscribe('DUMMY', lambda ctx: None)
+    await hauto.bus.fire('DUMMY', parent='ward', wait='ALL_COMPLETED')
+    assert 'INTENT_START' not in dispatched
+    assert 'INTENT_END' not in dispatched
+
+    # observed meta events do not hold up the intent they describe
+    listened = asyncio.Event()
+
+    async def _slow_listener(ctx):
+        await asyncio.sleep(0.25)
+        listened.set()
+
+    hauto.bus.subscribe('INTENT_START', _slow_listener)
+    await hauto.bus.fire('DUMMY', parent='ward', wait='ALL_COMPLETED')
+    assert intent.runs == 2
+    assert 'INTENT_START' in dispatched
+    assert not listened.is_set()
+
+    await asyncio.wait_for(listened.wait(), timeout=1)
+    await hauto.stop()
+
+
+@test('EventBus fires bursts of events in bounded chunks', tags=['unit'])
+async def _(cfg=cfg_hauto):
+    hauto = Hautomate(cfg)
+    in_flight = peak = 0
+
+    async def _dummy(ctx):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    intent = hauto.bus.subscribe('DUMMY', _dummy)
+    events = [('dummy', {'n': n}) for n in range(100)] + [('NULL', {})] * 100
+    fired = await hauto.bus.fire_many(events, parent='ward', chunk_size=10, wait=True)
+
+    assert fired == 100
+    assert intent.runs == 100
+    assert peak <= 10
+
+
+@test('EventBus never splits an event across chunks, nor overfills one', tags=['unit'])
+async def _(cfg=cfg_hauto):
+    hauto = Hautomate(cfg)
+    in_flight = peak = 0
+
+    async def _dummy(ctx):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    intents = [hauto.bus.subscribe('DUMMY', _dummy) for _ in range(3)]
+    events = [('dummy', {'n': n}) for n in range(20)]
+    fired = await hauto.bus.fire_many(events, parent='ward', chunk_size=10, wait=True)
+
+    assert fired == 60
+    assert all(intent.runs == 20 for intent in intents)
+    assert peak <= 9
+
+
+@test('EventBus reports the events it has subscribers for', tags=['unit'])
+async def _(cfg=cfg_hauto):
+    from hautomate.util.pattern import EventPattern
+
+    hauto = Hautomate(cfg)
+    bus = hauto.bus
+    before = bus.subscribed()
+
+    one = bus.subscribe('DUMMY', lambda ctx: None)
+    two = bus.subscribe('*', Intent('*', lambda ctx: None, pattern=EventPattern('LITERAL', 'A', 'B')))
+    assert bus.subscribed() == {*before, 'DUMMY', 'A', 'B'}
+    assert '*' not in bus.subscribed()
+
+    three = bus.subscribe('*', Intent('*', lambda ctx: None, pattern=EventPattern('PREFIX', 'DUM')))
+    assert bus.subscribed() is None
+
+    three.cancel()
+    two.cancel()
+    one.cancel()
+    assert bus.subscribed() == before
@@ -0,0 +1,52 @@
+from ward import test, raises
+
+from hautomate.settings import HautoConfig
+from hautomate.context import Context
+from hautomate.errors import HautoError
+from hautomate.intent import Intent
+from hautomate.app import App
+from hautomate import Hautomate
+
+from tests.fixtures import cfg_data_hauto
+
+
+def _blocking(ctx):
+    return 1
+
+
+@test('ExecutorRegistry shares a single pool by default', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto):
+    hauto = Hautomate(HautoConfig(**cfg_data))
+    app = App(hauto, name='some_app')
+    intent = Intent('DUMMY', _blocking)
+    intent._app = app
+
+    assert hauto.executors.for_intent(intent) is hauto.executors.get()
+    assert hauto.executors.names == ['hautomate']
+
+    with raises(HautoError):
+        await hauto.executors.run_in_process(_blocking, None)
+
+
+@test('ExecutorRegistry isolates Apps into their own metered pools', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto):
+    data = {**cfg_data, 'executor': {'isolate': True, 'max_workers': 2}}
+    hauto = Hautomate(HautoConfig(**data))
+    app = App(hauto, name='some_app')
+    intent = Intent('DUMMY', _blocking)
+    intent._app = app
+
+    ctx = Context(
+        hauto, 'DUMMY', event_data={}, target=intent, when=hauto.now, parent='ward.test'
+    )
+
+    assert await intent(ctx) == 1
+    assert hauto.executors.names == ['some_app']
+
+    stats = hauto.executors.stats()['some_app']
+    assert stats['max_workers'] == 2
+    assert stats['submitted'] == stats['completed'] == 1
+    assert stats['queued'] == stats['running'] == 0
+
+    hauto.executors.shutdown(wait=True)
+    assert hauto.executors.names == []
@@ -1,13 +1,35 @@
+import asyncio
+
 from ward import test, each, raises
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant, Event, State
+from hautomate.apis.homeassistant.events import (
+    HASS_EVENT_RECEIVE, HASS_EVENTS_RECEIVE, HASS_STATE_CHANGED, HASS_ENTITY_CREATE,
+    HASS_ENTITY_CHANGE
+)
 from hautomate.settings import HautoConfig
+from hautomate.apis import homeassistant, moment
 from hautomate import Hautomate
 import pydantic
 
 from tests.fixtures import cfg_data_hauto
 
 
+def _hauto(cfg_data, *, port: int=None, **api_configs) -> Hautomate:
+    """
+    Build Hautomate on an in-process Home Assistant, or a FakeHass at <port>.
+    """
+    if port is None:
+        hass = {'feed': 'custom_component', 'hass_interface': HomeAssistant()}
+    else:
+        hass = {'feed': 'websocket', 'host': 'http://127.0.0.1', 'port': port, 'access_token': 'token'}
+
+    data = cfg_data.copy()
+    data['api_configs'] = {'homeassistant': hass, **api_configs}
+    return Hautomate(HautoConfig(**data))
+
+
 @test('HomeAssistantConfig validates for {feed}', tags=['unit'])
 async def _(
     cfg_data=cfg_data_hauto,
@@ -40,3 +62,639 @@ async def _(
         hauto = Hautomate(cfg)
         assert hauto.is_running is True
         assert hauto.is_ready is False
+
+
+@test('HomeAssistant ingests bursts of Home Assistant events', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto):
+    hauto = _hauto(cfg_data)
+    await hauto.start()
+    seen = []
+
+    hauto.bus.subscribe(HASS_ENTITY_CREATE, lambda ctx: seen.append(ctx.event))
+    hauto.bus.subscribe(HASS_ENTITY_CHANGE, lambda ctx: seen.append(ctx.event))
+    hauto.bus.subscribe(HASS_STATE_CHANGED, lambda ctx: seen.append(ctx.event))
+    hauto.bus.subscribe('CALL_SERVICE', lambda ctx: seen.append(ctx.event))
+
+    off = State('light.kitchen', 'off')
+    on = State('light.kitchen', 'on')
+    hass_events = [
+        Event(EVENT_STATE_CHANGED, {'entity_id': off.entity_id, 'old_state': None, 'new_state': off}),
+        Event(EVENT_STATE_CHANGED, {'entity_id': on.entity_id, 'old_state': off, 'new_state': on}),
+        Event('call_service', {'domain': 'light', 'service': 'turn_on'}),
+    ]
+
+    await hauto.bus.fire(
+        HASS_EVENTS_RECEIVE, parent='ward.test', wait='ALL_COMPLETED', hass_events=hass_events
+    )
+    await asyncio.sleep(0.05)
+
+    assert sorted(seen) == sorted([
+        HASS_STATE_CHANGED, HASS_ENTITY_CREATE,
+        HASS_STATE_CHANGED, HASS_ENTITY_CHANGE,
+        'CALL_SERVICE'
+    ])
+    await hauto.stop()
+
+
+@test('HomeAssistant.monitor coalesces bursts per entity', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto):
+    hauto = _hauto(cfg_data, moment={'simulate': True})
+    await hauto.start()
+    seen = []
+
+    def _power(watts, old=None):
+        new = State('sensor.power', str(watts))
+        data = {'entity_id': new.entity_id, 'old_state': old, 'new_state': new}
+        return new, Event(EVENT_STATE_CHANGED, data)
+
+    old, created = _power(0)
+    hass_events = [created]
+
+    for watts in range(1, 6):
+        old, event = _power(watts, old=old)
+        hass_events.append(event)
+
+    homeassistant.monitor('sensor.power', coalesce=1.0, fn=lambda ctx: seen.append(ctx.event_data))
+    homeassistant.monitor('sensor.other', coalesce=1.0, fn=lambda ctx: seen.append(ctx.event_data))
+    await asyncio.sleep(0)
+
+    await hauto.bus.fire(
+        HASS_EVENTS_RECEIVE, parent='ward.test', wait='ALL_COMPLETED', hass_events=hass_events
+    )
+    assert seen == []
+
+    await moment.advance(1.0)
+    assert len(seen) == 1
+    assert seen[0]['coalesced'] == 5
+    assert seen[0]['old_entity'].state == '0'
+    assert seen[0]['new_entity'].state == '5'
+    assert seen[0]['old_view'].entity.state == '0'
+    await hauto.stop()
+
+
+@test('HomeAssistant.monitor compares from_value against the state before a burst', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto):
+    hauto = _hauto(cfg_data, moment={'simulate': True})
+    await hauto.start()
+    seen = []
+
+    homeassistant.monitor(
+        'light.hallway', from_value='off', to_value='on', coalesce=1.0, fn=lambda ctx: seen.append(ctx)
+    )
+    await asyncio.sleep(0)
+
+    old = State('light.hallway', 'off')
+    hass_events = []
+
+    # drops out mid-burst, then settles on
+    for value in ('on', 'unavailable', 'on'):
+        new = State('light.hallway', value)
+        data = {'entity_id': new.entity_id, 'old_state': old, 'new_state': new}
+        hass_events.append(Event(EVENT_STATE_CHANGED, data))
+        old = new
+
+    await hauto.bus.fire(
+        HASS_EVENTS_RECEIVE, parent='ward.test', wait='ALL_COMPLETED', hass_events=hass_events
+    )
+    await moment.advance(1.0)
+    await asyncio.sleep(0.05)
+
+    assert len(seen) == 1
+    assert seen[0].event_data['coalesced'] == 3
+    await hauto.stop()
+
+
+@test('HomeAssistant.monitor checks a coalesced range against the end of the burst', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto):
+    hauto = _hauto(cfg_data, moment={'simulate': True})
+    await hauto.start()
+    seen = []
+
+    homeassistant.monitor(
+        'sensor.power', above_value=10, coalesce=1.0, fn=lambda ctx: seen.append(ctx.event_data)
+    )
+    await asyncio.sleep(0)
+
+    async def _burst(*values):
+        nonlocal old
+        hass_events = []
+
+        for value in values:
+            new = State('sensor.power', value)
+            data = {'entity_id': new.entity_id, 'old_state': old, 'new_state': new}
+            hass_events.append(Event(EVENT_STATE_CHANGED, data))
+            old = new
+
+        await hauto.bus.fire(
+            HASS_EVENTS_RECEIVE, parent='ward.test', wait='ALL_COMPLETED', hass_events=hass_events
+        )
+        await moment.advance(1.0)
+        await asyncio.sleep(0.05)
+
+    # passes through the range, but ends below it
+    old = State('sensor.power', '0')
+    await _burst('15', '5')
+    assert seen == []
+
+    # ends within the range
+    await _burst('8', '12')
+    assert len(seen) == 1
+    assert seen[0]['new_entity'].state == '12'
+    assert seen[0]['coalesced'] == 2
+    await hauto.stop()
+
+
+@test('HomeAssistant.monitor routes state changes by entity_id and domain', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto):
+    hauto = _hauto(cfg_data)
+    await hauto.start()
+    seen = []
+
+    def _record(name):
+        return lambda ctx: seen.append(name)
+
+    for n in range(100):
+        homeassistant.monitor(f'light.room_{n}', fn=_record(n))
+
+    homeassistant.monitor(domain='light', fn=_record('light'))
+    homeassistant.monitor(domain='switch', fn=_record('switch'))
+    cancelled = homeassistant.monitor('light.room_7', fn=_record('cancelled'))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    off = State('light.room_7', 'off')
+    on = State('light.room_7', 'on')
+    event = Event(EVENT_STATE_CHANGED, {'entity_id': on.entity_id, 'old_state': off, 'new_state': on})
+    await hauto.bus.fire(HASS_EVENT_RECEIVE, parent='ward.test', wait='ALL_COMPLETED', hass_event=event)
+    await asyncio.sleep(0.05)
+
+    assert sorted(seen, key=str) == [7, 'light']
+    assert len(hauto.apis.homeassistant._monitors.match(HASS_ENTITY_CHANGE, 'light.room_7')) == 2
+    await hauto.stop()
+
+
+@test('HassWebConnector keeps a local cache of entity states', tags=['unit'])
+async def _():
+    from hautomate.apis.homeassistant._compat import HassWebConnector
+    from tests.fake_hass import FakeHass, state
+
+    snapshot = [
+        state('light.kitchen', 'off'),
+        state('light.office', 'on', brightness=255),
+        state('sensor.outdoor', '12.5'),
+    ]
+    received = []
+
+    async with FakeHass(snapshot) as fake:
+        hass = HassWebConnector(host='127.0.0.1', port=fake.port, access_token='token')
+        hass.on_events = received.extend
+        await hass.connect()
+
+        assert len(hass.states) == 3
+        assert hass.states.get('light.office').attributes['brightness'] == 255
+        assert {s.entity_id for s in hass.states.all('light')} == {'light.kitchen', 'light.office'}
+
+        await fake.set_state(state('light.kitchen', 'on', updated='2020-10-16T12:01:00+00:00'))
+        await fake.set_state(state('switch.fan', 'on', updated='2020-10-16T12:01:00+00:00'))
+
+        assert hass.states.get('light.kitchen').state == 'on'
+        assert hass.states.all('switch')[0].entity_id == 'switch.fan'
+        assert [e.data['entity_id'] for e in received] == ['light.kitchen', 'switch.fan']
+        assert received[0].data['old_state'].state == 'off'
+
+        await hass.close()
+
+
+@test('HassWebConnector accepts a state snapshot larger than 1 MiB', tags=['unit'])
+async def _():
+    from hautomate.apis.homeassistant._compat import HassWebConnector
+    from tests.fake_hass import FakeHass, state
+
+    snapshot = [state(f'sensor.{n}', str(n), history='x' * 512) for n in range(4000)]
+
+    async with FakeHass(snapshot) as fake:
+        hass = HassWebConnector(host='127.0.0.1', port=fake.port, access_token='token')
+        await asyncio.wait_for(hass.connect(), timeout=5)
+        assert len(hass.states) == 4000
+        await hass.close()
+
+
+@test('HassWebConnector answers concurrent requests out of order', tags=['unit'])
+async def _():
+    from hautomate.apis.homeassistant._compat import HassWebConnector
+    from hautomate.errors import HautoError
+    from tests.fake_hass import FakeHass
+
+    async with FakeHass() as fake:
+        fake.service_delays = {'light.turn_on': 0.2, 'light.turn_off': 0, 'light.toggle': None}
+        fake.failing_services = {'light.explode'}
+        hass = HassWebConnector(host='127.0.0.1', port=fake.port, access_token='token', timeout=0.5)
+        await hass.connect()
+
+        finished = []
+
+        async def call(service):
+            try:
+                await hass.call_service('light', service, {'entity_id': 'light.kitchen'})
+            except (HautoError, asyncio.TimeoutError) as e:
+                finished.append((service, type(e)))
+            else:
+                finished.append((service, None))
+
+        await asyncio.gather(*(call(s) for s in ('turn_on', 'turn_off', 'explode', 'toggle')))
+
+        assert finished == [
+            ('turn_off', None),
+            ('explode', HautoError),
+            ('turn_on', None),
+            ('toggle', asyncio.TimeoutError),
+        ]
+        assert hass._ws_responses == {}
+
+        await hass.close()
+
+
+@test('HassWebConnector reconnects and resyncs states missed while disconnected', tags=['unit'])
+async def _():
+    from hautomate.apis.homeassistant._compat import HassWebConnector
+    from tests.fake_hass import FakeHass, state
+
+    later = '2020-10-16T12:05:00+00:00'
+    snapshot = [
+        state('light.kitchen', 'off'),
+        state('light.office', 'on'),
+        state('sensor.outdoor', '12.5'),
+    ]
+    received = []
+
+    async with FakeHass(snapshot) as fake:
+        hass = HassWebConnector(
+            host='127.0.0.1', port=fake.port, access_token='token', reconnect_delay=0.05
+        )
+        hass.on_events = received.extend
+        await hass.connect()
+        await fake.drop()
+
+        # Home Assistant restarted, and things happened in the meantime
+        fake.states['light.kitchen'] = state('light.kitchen', 'on', updated=later)
+        fake.states['switch.fan'] = state('switch.fan', 'on', updated=later)
+        del fake.states['light.office']
+
+        await asyncio.sleep(0.25)
+        assert [m['type'] for m in fake.received].count('subscribe_events') == 2
+
+        changes = {e.data['entity_id']: e.data for e in received}
+        assert set(changes) == {'light.kitchen', 'switch.fan', 'light.office'}
+        assert changes['light.kitchen']['old_state'].state == 'off'
+        assert changes['light.kitchen']['new_state'].state == 'on'
+        assert changes['switch.fan']['old_state'] is None
+        assert changes['light.office']['new_state'] is None
+        assert set(hass.states.entity_ids) == {'light.kitchen', 'sensor.outdoor', 'switch.fan'}
+
+        # and the feed is live again
+        await fake.set_state(state('sensor.outdoor', '13.0', updated=later))
+        assert hass.states.get('sensor.outdoor').state == '13.0'
+        assert received[-1].data['entity_id'] == 'sensor.outdoor'
+
+        await hass.close()
+
+
+@test('HomeAssistant subscribes only to the Home Assistant events it listens for', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto):
+    from hautomate.apis import trigger
+    from tests.fake_hass import FakeHass
+
+    async with FakeHass() as fake:
+        hauto = _hauto(cfg_data, port=fake.port)
+        await hauto.start()
+        await asyncio.sleep(0.05)
+
+        event_types = {t for subs in fake.subscriptions.values() for t in subs.values()}
+        assert None not in event_types
+        assert '*' not in event_types
+        assert 'state_changed' in event_types
+        assert 'call_service' not in event_types
+
+        seen = []
+        intent = trigger.on('CALL_SERVICE', fn=lambda ctx: seen.append(ctx.event_data))
+        trigger.on('TIME_SCHEDULED', fn=lambda ctx: None)
+        trigger.on('INTENT_END', fn=lambda ctx: None)
+        await asyncio.sleep(0.05)
+        event_types = {t for subs in fake.subscriptions.values() for t in subs.values()}
+        assert event_types == {'state_changed', 'call_service'}
+
+        await fake.push_event('call_service', {'domain': 'light', 'service': 'turn_on'})
+        await fake.push_event('time_changed', {'now': '2020-10-16T12:00:00+00:00'})
+        assert seen == [{'domain': 'light', 'service': 'turn_on'}]
+
+        intent.cancel()
+        await asyncio.sleep(0.05)
+        event_types = {t for subs in fake.subscriptions.values() for t in subs.values()}
+        assert 'call_service' not in event_types
+        assert 'state_changed' in event_types
+
+        await hauto.stop()
+
+
+@test('HassWebConnector hands events between subscriptions without loss or duplicates', tags=['unit'])
+async def _():
+    from hautomate.apis.homeassistant._compat import HassWebConnector
+    from tests.fake_hass import FakeHass
+
+    received = []
+
+    async with FakeHass() as fake:
+        hass = HassWebConnector(host='127.0.0.1', port=fake.port, access_token='token')
+        hass.on_events = lambda events: received.extend(e.event_type for e in events)
+        await hass.connect()
+        assert set(hass._subscriptions) == {None}
+
+        for event_types in ({'call_service'}, None, set()):
+            await hass.set_event_types(event_types)
+            await fake.push_event('call_service', {})
+            await fake.push_event('time_changed', {})
+
+        assert received == [
+            'call_service',
+            'call_service', 'time_changed',
+        ]
+        assert set(hass._subscriptions) == {'state_changed'}
+        assert len(next(iter(fake.subscriptions.values()))) == 1
+
+        await hass.close()
+
+
+@test('get_codec falls back to the fastest installed JSON library', tags=['unit'])
+def _():
+    from hautomate.apis.homeassistant.codec import get_codec
+
+    installed = []
+
+    for name in ('orjson', 'ujson'):
+        try:
+            __import__(name)
+        except ImportError:
+            continue
+
+        installed.append(name)
+
+    codec = get_codec()
+    assert codec.name == (installed + ['json'])[0]
+    assert codec.loads(codec.dumps({'id': 1, 'type': 'get_states'})) == {'id': 1, 'type': 'get_states'}
+    assert isinstance(codec.dumps({}), str)
+    assert get_codec('json').name == 'json'
+
+    with raises(ValueError):
+        get_codec('yaml')
+
+
+@test('HassWebConnector defers parsing state changes nobody asked for', tags=['unit'])
+async def _():
+    from hautomate.apis.homeassistant._compat import HassWebConnector
+    from tests.fake_hass import FakeHass, state
+
+    received = []
+
+    async with FakeHass([state('light.kitchen', 'off')]) as fake:
+        hass = HassWebConnector(host='127.0.0.1', port=fake.port, access_token='token', codec='json')
+        hass.on_events = received.extend
+        await hass.set_event_types({'call_service'})
+        await hass.connect()
+        assert isinstance(hass.states._states['light.kitchen'], dict)
+
+        await fake.set_state(state('light.kitchen', 'on', updated='2020-10-16T12:01:00+00:00'))
+        await fake.push_event('call_service', {'domain': 'light', 'service': 'turn_on'})
+
+        assert [e.event_type for e in received] == ['call_service']
+        assert isinstance(hass.states._states['light.kitchen'], dict)
+        assert isinstance(hass.states.get('light.kitchen'), State)
+        assert hass.states.get('light.kitchen').state == 'on'
+
+        await hass.close()
+
+
+@test('HassWebConnector pipelines bursts of service calls and events', tags=['unit'])
+async def _():
+    import json
+    import time
+
+    import httpx
+
+    from hautomate.apis.homeassistant._compat import HassWebConnector
+    from tests.fake_hass import FakeHass
+
+    posted = []
+
+    async def rest_api(scope, receive, send):
+        body = await receive()
+        posted.append((scope['path'], json.loads(body['body'])))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b'{"message": "Event fired."}'})
+
+    async with FakeHass() as fake:
+        fake.service_delays = {'light.turn_on': 0.1}
+        hass = HassWebConnector(host='http://127.0.0.1', port=fake.port, access_token='token')
+        await hass.connect()
+
+        start = time.perf_counter()
+        calls = [('light', 'turn_on', {'entity_id': f'light.{n}'}) for n in range(30)]
+        results = await hass.call_services(calls)
+        assert time.perf_counter() - start < 1
+        assert all('context' in r for r in results)
+
+        ids = [m['id'] for m in fake.received]
+        assert ids == sorted(ids)
+
+        hass._http = httpx.AsyncClient(app=rest_api, base_url=hass.base_url)
+        await asyncio.gather(hass.fire_event('kitchen_motion', {'on': True}), hass.fire_event('door_opened'))
+        assert sorted(posted) == [
+            ('/api/events/door_opened', {}),
+            ('/api/events/kitchen_motion', {'on': True}),
+        ]
+
+        await hass.close()
+
+
+@test('HomeAssistant.{service} makes one call per domain of the entities given', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto, service=each('turn_on', 'turn_off', 'toggle')):
+    from hautomate.errors import HautoError
+    from tests.fake_hass import FakeHass
+
+    async with FakeHass() as fake:
+        hauto = _hauto(cfg_data, port=fake.port)
+        await hauto.start()
+        method = getattr(homeassistant, service)
+        connector = hauto.apis.homeassistant.hass_interface._hass
+        batches = []
+        call_services = connector.call_services
+
+        async def _spy(calls):
+            batches.append(len(calls))
+            return await call_services(calls)
+
+        connector.call_services = _spy
+
+        entities = ['light.kitchen', 'switch.fan', 'light.office']
+        results = await method(entities, wait=True, transition=2)
+        calls = [m for m in fake.received if m['type'] == 'call_service']
+
+        # both domains go out together, pipelined over the websocket
+        assert batches == [2]
+
+        assert [(c['domain'], c['service']) for c in calls] == [('homeassistant', service)] * 2
+        assert [c['service_data'] for c in calls] == [
+            {'transition': 2, 'entity_id': ['light.kitchen', 'light.office']},
+            {'transition': 2, 'entity_id': ['switch.fan']},
+        ]
+        assert set(results) == set(entities)
+
+        fake.failing_services = {f'homeassistant.{service}'}
+        results = await method('light.kitchen', wait=True)
+        assert isinstance(results['light.kitchen'], HautoError)
+        assert await method('light.kitchen') is None
+
+        await hauto.stop()
+
+
+@test('HomeAssistant.monitor fires once a state has held for a duration', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto):
+    hauto = _hauto(cfg_data, moment={'simulate': True})
+    await hauto.start()
+    seen = []
+    door = State('binary_sensor.door', 'off')
+
+    async def _change(value, **attrs):
+        nonlocal door
+        new = State(door.entity_id, value, attrs)
+        data = {'entity_id': door.entity_id, 'old_state': door, 'new_state': new}
+        event = Event(EVENT_STATE_CHANGED, data)
+        await hauto.bus.fire(HASS_EVENT_RECEIVE, parent='ward.test', wait='ALL_COMPLETED', hass_event=event)
+        door = new
+
+    homeassistant.monitor(
+        'binary_sensor.door', to_value='on', duration=300, fn=lambda ctx: seen.append(ctx.event_data)
+    )
+    await asyncio.sleep(0)
+
+    # opened, but closed again too soon
+    await _change('on')
+    await moment.advance(200)
+    await _change('off')
+    await moment.advance(200)
+    assert seen == []
+
+    # opened, and left open through a chatty attribute
+    await _change('on')
+
+    for n in range(10):
+        await moment.advance(20)
+        await _change('on', battery=100 - n)
+
+    assert len(hauto.apis.homeassistant._holds) == 1
+    await moment.advance(100)
+
+    assert len(seen) == 1
+    assert seen[0]['old_entity'].state == 'off'
+    assert seen[0]['new_entity'].state == 'on'
+    assert len(hauto.apis.homeassistant._holds) == 0
+    await hauto.stop()
+
+
+@test('HomeAssistant.monitor finds every numeric range a value lands in', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto):
+    import itertools as it
+
+    hauto = _hauto(cfg_data)
+    await hauto.start()
+    seen = set()
+    ranges = []
+
+    def _record(name):
+        return lambda ctx: seen.add(name)
+
+    for above, below, inclusive in it.product((None, 0, 10, 20), (None, 10, 20, 30), (False, True)):
+        if above is None and below is None:
+            continue
+
+        homeassistant.monitor(
+            'sensor.power', above_value=above, below_value=below, inclusive=inclusive,
+            fn=_record((above, below, inclusive))
+        )
+        ranges.append((above, below, inclusive))
+
+    homeassistant.monitor(
+        domain='sensor', attribute='voltage', mode='attribute', above_value='230',
+        fn=_record('voltage')
+    )
+    homeassistant.monitor('sensor.other', above_value=0, fn=_record('other'))
+    await asyncio.sleep(0)
+
+    def _expected(value):
+        return {
+            (above, below, inclusive) for above, below, inclusive in ranges
+            if (above is None or value > above or (inclusive and value == above))
+            and (below is None or value < below or (inclusive and value == below))
+        }
+
+    old = State('sensor.power', '5', {'voltage': 230})
+
+    for value, voltage in (('20', 240), ('-3.5', 230), ('10', 229), ('unavailable', 250)):
+        seen.clear()
+        new = State('sensor.power', value, {'voltage': voltage})
+        event = Event(EVENT_STATE_CHANGED, {'entity_id': new.entity_id, 'old_state': old, 'new_state': new})
+        await hauto.bus.fire(HASS_EVENT_RECEIVE, parent='ward.test', wait='ALL_COMPLETED', hass_event=event)
+        await asyncio.sleep(0.01)
+        old = new
+
+        expected = set() if value == 'unavailable' else _expected(float(value))
+        assert seen == expected
+
+    # only attributes changed
+    seen.clear()
+    new = State('sensor.power', old.state, {'voltage': 250})
+    event = Event(EVENT_STATE_CHANGED, {'entity_id': new.entity_id, 'old_state': old, 'new_state': new})
+    await hauto.bus.fire(HASS_EVENT_RECEIVE, parent='ward.test', wait='ALL_COMPLETED', hass_event=event)
+    await asyncio.sleep(0.01)
+    assert seen == {'voltage'}
+
+    # cancelled ranges are dropped at once, even those no value lands in again
+    thresholds = hauto.apis.homeassistant._thresholds
+    before = len(thresholds)
+    unreachable = homeassistant.monitor('sensor.power', above_value=1000, fn=_record('unreachable'))
+    await asyncio.sleep(0.01)
+    assert len(thresholds) == before + 1
+
+    unreachable.cancel()
+    await asyncio.sleep(0.01)
+    assert len(thresholds) == before
+
+    await hauto.stop()
+
+
+@test('HomeAssistant parses each state change once for every listener', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto):
+    hauto = _hauto(cfg_data)
+    await hauto.start()
+    seen = []
+
+    def _record(ctx):
+        seen.append(ctx.event_data['new_view'])
+
+    hauto.bus.subscribe(HASS_STATE_CHANGED, _record)
+    hauto.bus.subscribe(HASS_ENTITY_CHANGE, _record)
+    homeassistant.monitor('sensor.temperature', above_value=20, fn=_record)
+    await asyncio.sleep(0)
+
+    cold = State('sensor.temperature', '19.5')
+    warm = State('sensor.temperature', '21.5', {'unit_of_measurement': '°C'})
+    event = Event(EVENT_STATE_CHANGED, {'entity_id': warm.entity_id, 'old_state': cold, 'new_state': warm})
+    await hauto.bus.fire(HASS_EVENT_RECEIVE, parent='ward.test', wait='ALL_COMPLETED', hass_event=event)
+    await asyncio.sleep(0.05)
+
+    assert len(seen) == 3
+    assert all(view is seen[0] for view in seen)
+    assert seen[0].entity is warm
+    assert seen[0].number() == 21.5
+    assert seen[0].number('unit_of_measurement') is None
+    assert 'new_view' not in event.data
+    await hauto.stop()
@@ -0,0 +1,52 @@
+from ward import test, fixture
+import pendulum
+
+from hautomate.context import Context
+from hautomate.intent import Intent
+from hautomate.check import Check, Throttle
+from hautomate import Hautomate
+
+from tests.fixtures import cfg_hauto
+
+
+@fixture(scope='module')
+def hauto(cfg=cfg_hauto):
+    return Hautomate(cfg)
+
+
+def _ctx(hauto, intent):
+    return Context(
+        hauto, 'DUMMY', event_data={}, target=intent, when=pendulum.now(tz='UTC'),
+        parent='ward.test'
+    )
+
+
+@test('Intent evaluates safe_sync checks inline before scheduling others', tags=['unit'])
+async def _(hauto=hauto):
+    seen = []
+
+    async def async_check(ctx):
+        seen.append('async')
+        return True
+
+    checks = [Check(async_check), Check(lambda ctx: False)]
+    intent = Intent('DUMMY', lambda ctx: None, checks=checks)
+    assert await intent.can_run(_ctx(hauto, intent)) is False
+    assert seen == []
+
+    checks = [Check(async_check), Check(lambda ctx: True)]
+    intent = Intent('DUMMY', lambda ctx: None, checks=checks)
+    assert await intent.can_run(_ctx(hauto, intent)) is True
+    assert seen == ['async']
+
+
+@test('Intent evaluates a safe_sync cooldown only once checks pass', tags=['unit'])
+async def _(hauto=hauto):
+    cooldown = Throttle(60)
+    intent = Intent('DUMMY', lambda ctx: None, checks=[Check(lambda ctx: False), cooldown])
+    assert await intent.can_run(_ctx(hauto, intent)) is False
+    assert cooldown.tokens == 1
+
+    intent = Intent('DUMMY', lambda ctx: None, checks=[cooldown])
+    assert await intent.can_run(_ctx(hauto, intent)) is True
+    assert await intent.can_run(_ctx(hauto, intent)) is False
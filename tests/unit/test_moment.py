@@ -6,6 +6,7 @@ import pendulum
 
 from hautomate.apis.moment.events import EVT_TIME_SLIPPAGE
 from hautomate.apis.moment.checks import MomentaryCheck
+from hautomate.apis.moment.cron import CronExpression
 from hautomate.util.async_ import safe_sync
 from hautomate.settings import HautoConfig
 from hautomate.context import Context
@@ -165,3 +166,137 @@ async def _(
 
     ctx = Context(hauto, 'TIME_UPDATE', when=now.add(years=42), **ctx_kw)
     await chk(ctx) is False
+
+
+@test('Moment schedules intents on a timer rather than polling TIME_UPDATE', tags=['unit'])
+async def _(cfg=cfg_hauto):
+    hauto = Hautomate(cfg)
+    await hauto.start()
+    fired = []
+
+    @safe_sync
+    def record(ctx):
+        fired.append(ctx.event_data['scheduled_for'])
+
+    once = moment.soon(0.10, fn=record)
+    every = moment.every(0.10, fn=record, limit=3)
+    assert once not in hauto.bus.candidates('TIME_UPDATE')
+    assert every not in hauto.bus.candidates('TIME_UPDATE')
+
+    await asyncio.sleep(0.50)
+    assert once.runs == 1
+    assert every.runs == 3
+    assert fired == sorted(fired)
+    assert len(hauto.apis.moment._scheduler) == 0
+
+    await hauto.stop()
+
+
+@test('CronExpression({expr}) fires next at {expected}', tags=['unit'])
+def _(
+    expr=each(
+        '*/5 6-22 * * MON-FRI',
+        '*/5 6-22 * * MON-FRI',
+        '0 0 29 FEB *',
+        '30 2 * * *',
+        '30 1 * * *',
+        '0 12 13 * FRI',
+    ),
+    after=each(
+        '2020-10-16T12:03:10-05:00',
+        '2020-10-16T22:56:00-05:00',
+        '2021-01-01T00:00:00-06:00',
+        '2020-03-07T12:00:00-06:00',
+        '2020-10-31T12:00:00-05:00',
+        '2020-10-16T12:00:00-05:00',
+    ),
+    expected=each(
+        '2020-10-16T12:05:00-05:00',
+        '2020-10-19T06:00:00-05:00',
+        '2024-02-29T00:00:00-06:00',
+        '2020-03-08T03:30:00-05:00',
+        '2020-11-01T01:30:00-05:00',
+        '2020-10-23T12:00:00-05:00',
+    )
+):
+    cron = CronExpression(expr, tz='America/Chicago')
+    when = cron.next_after(pendulum.parse(after))
+
+    # PEP 495: datetimes in a repeated interval never compare equal across zones
+    assert when.timestamp() == pendulum.parse(expected).timestamp()
+
+
+@test('CronExpression handles DST transitions in {tz}', tags=['unit'])
+def _(tz='America/Chicago'):
+    cron = CronExpression('30 2 * * *', tz=tz)
+
+    # 02:30 does not exist when springing forward, so fire right after
+    when = cron.next_after(pendulum.parse('2020-03-08T00:00:00-06:00'))
+    assert when.timestamp() == pendulum.parse('2020-03-08T03:30:00-05:00').timestamp()
+
+    # 01:30 happens twice when falling back, but we only fire once
+    cron = CronExpression('30 1 * * *', tz=tz)
+    when = cron.next_after(pendulum.parse('2020-11-01T01:30:00-05:00'))
+    assert when.timestamp() == pendulum.parse('2020-11-02T01:30:00-06:00').timestamp()
+
+
+@test('CronExpression rejects {expr}', tags=['unit'])
+def _(expr=each('* * * *', '60 * * * *', '* * * FOO *', '*/0 * * * *', '5-1 * * * *')):
+    with raises(ValueError):
+        CronExpression(expr)
+
+
+@test('Moment fast-forwards a simulated clock from deadline to deadline', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto):
+    data = cfg_data.copy()
+    epoch = pendulum.parse('2020-10-16T00:00:00-05:00')
+    data['api_configs'] = {'moment': {'epoch': epoch, 'simulate': True}}
+    hauto = Hautomate(HautoConfig(**data))
+    await hauto.start()
+    fired = []
+
+    async def record(ctx):
+        fired.append(hauto.now)
+        await hauto.sleep(30)
+        fired.append(hauto.now)
+
+    moment.every(pendulum.duration(hours=1), fn=record, limit=24 * 7)
+    assert hauto.now == epoch
+
+    beg = time.perf_counter()
+    now = await moment.advance(pendulum.duration(weeks=1))
+    assert time.perf_counter() - beg < 10
+    assert now == epoch.add(weeks=1)
+
+    # every fire, as well as the virtual sleep within it, happened on time
+    assert len(fired) == 24 * 7 * 2
+    assert fired[:3] == [epoch, epoch.add(seconds=30), epoch.add(hours=1)]
+
+    with raises(ValueError):
+        await moment.advance_to(epoch)
+
+    await hauto.stop()
+
+
+@test('Moment resolves times of day in Hautomate\'s timezone', tags=['unit'])
+async def _(cfg_data=cfg_data_hauto):
+    data = cfg_data.copy()
+    data['timezone'] = 'America/Chicago'
+    epoch = pendulum.parse('2020-10-16T00:00:00', tz='America/Chicago')
+    data['api_configs'] = {'moment': {'epoch': epoch, 'simulate': True}}
+    hauto = Hautomate(HautoConfig(**data))
+    await hauto.start()
+    fired = []
+
+    moment.at('08:00', fn=lambda ctx: fired.append(hauto.now))
+    moment.every(pendulum.duration(days=1), when='09:00', fn=lambda ctx: fired.append(hauto.now))
+    await asyncio.sleep(0)
+
+    now = await moment.advance_to('08:00')
+    assert now == pendulum.parse('2020-10-16T08:00:00', tz='America/Chicago')
+    assert fired == [now]
+
+    await moment.advance_to('09:00')
+    assert fired == [now, now.add(hours=1)]
+
+    await hauto.stop()
@@ -26,6 +26,20 @@ async def _(cfg=cfg_hauto):
         await trigger.wait_for('SOME_EVENT', timeout=0.5)
 
 
+@test('Trigger API wakes waiters from a single listener run per event', tags=['unit'])
+async def _(cfg=cfg_hauto):
+    hauto = Hautomate(cfg)
+    await hauto.start()
+    waiter = trigger.wait_for('SOME_EVENT')
+    await asyncio.sleep(0)
+
+    # the catch-all listener does the work, the Intent on the event itself never runs
+    interest, = [i for i in hauto.bus.candidates('SOME_EVENT') if i.event == 'SOME_EVENT']
+    await hauto.bus.fire('SOME_EVENT', parent='ward.test', wait='ALL_COMPLETED')
+    assert isinstance(await waiter, Context) is True
+    assert interest.runs == 0
+
+
 @test('trigger.{method_name}() returns an Intent & validates correctly', tags=['unit'])
 async def _(
     cfg=cfg_hauto,
@@ -68,3 +82,16 @@ async def _(
     # failing condition, counter should not increase
     await hauto.bus.fire('LOL', wait='ALL_COMPLETED', parent='ward.test')
     assert counter == 1
+
+
+@test('trigger pattern intents are never scheduled for non-matching events', tags=['unit'])
+async def _(cfg=cfg_hauto):
+    hauto = Hautomate(cfg)
+    await hauto.start()
+
+    intent = trigger.startswith('DUM', fn=lambda ctx: None)
+    assert intent in hauto.bus.candidates('DUMMY')
+    assert intent not in hauto.bus.candidates('LOL')
+
+    intent.cancel()
+    assert intent not in hauto.bus.candidates('DUMMY')
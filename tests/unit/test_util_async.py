@@ -88,3 +88,37 @@ async def _(name=each(*_NAME[:-2]), concurrency=each(*_CONCURRENCY[:-2]), trial=
 def _():
     assert hasattr(_dummy_fn, 'safe_sync') is False
     assert hasattr(safe_sync(_dummy_fn), 'safe_sync') is True
+
+
+@test('Asyncable runs safe_sync callables inline', tags=['unit'])
+async def _():
+    awt = Asyncable(lambda: 1)()
+    assert awt.done() is True
+    assert await awt == 1
+
+    awt = Asyncable(lambda: 1 / 0)()
+    assert awt.done() is True
+
+    with raises(ZeroDivisionError):
+        await awt
+
+
+@test('determine_concurrency caches classification per underlying function', tags=['unit'])
+def _():
+    def _fn():
+        return 1
+
+    class _Dummy:
+        def method(self):
+            return 1
+
+    assert determine_concurrency(_fn) == 'potentially_unsafe_sync'
+    assert determine_concurrency(ft.partial(_fn)) == 'potentially_unsafe_sync'
+    assert determine_concurrency(_Dummy().method) == 'potentially_unsafe_sync'
+
+    # marking as safe_sync after the fact invalidates the cache
+    safe_sync(_fn)
+    assert determine_concurrency(_fn) == 'safe_sync'
+
+    with raises(ValueError):
+        Asyncable(_fn, concurrency='not_a_paradigm')
@@ -0,0 +1,38 @@
+from ward import test, each
+
+from hautomate.util.pattern import EventPattern, PatternIndex
+
+
+@test('EventPattern.from_regex classifies {pattern} as {kind}', tags=['unit'])
+def _(
+    pattern=each('DUMMY', 'DUMMY|DUMBER', '^DUM.*', '.*MY$', '.*UMM.*', r'\wUMM\w'),
+    kind=each('LITERAL', 'LITERAL', 'PREFIX', 'SUFFIX', 'CONTAINS', 'REGEX')
+):
+    p = EventPattern.from_regex(pattern)
+    assert p.kind == kind
+    assert p.matches('DUMMY') is True
+    assert p.matches('LOL') is False
+
+
+@test('PatternIndex only matches items whose pattern describes the name', tags=['unit'])
+def _():
+    index = PatternIndex()
+    patterns = {
+        'literal': EventPattern('LITERAL', 'foo', 'bar'),
+        'prefix': EventPattern('PREFIX', 'HASS_'),
+        'suffix': EventPattern('SUFFIX', '_CHANGE'),
+        'contains': EventPattern('CONTAINS', 'ENTITY'),
+        'regex': EventPattern('REGEX', r'HASS_\w+_REMOVE'),
+    }
+
+    for name, pattern in patterns.items():
+        index.add(pattern, name)
+
+    assert len(index) == 5
+    assert index.match('FOO') == ['literal']
+    assert index.match('LOL') == []
+    assert sorted(index.match('HASS_ENTITY_CHANGE')) == ['contains', 'prefix', 'suffix']
+    assert sorted(index.match('HASS_ENTITY_REMOVE')) == ['contains', 'prefix', 'regex']
+
+    index.remove(patterns['prefix'], 'prefix')
+    assert sorted(index.match('HASS_ENTITY_CHANGE')) == ['contains', 'suffix']
@@ -0,0 +1,23 @@
+import asyncio
+
+from ward import test
+
+from hautomate.util.timers import KeyedTimers
+
+
+@test('KeyedTimers holds at most one timer per key', tags=['unit'])
+async def _():
+    timers = KeyedTimers()
+    fired = []
+
+    assert timers.start('a', 0.01, fired.append, 'a') is True
+    assert timers.start('a', 0.01, fired.append, 'a2') is False
+    timers.start('b', 0.01, fired.append, 'b')
+    timers.restart('b', 0.02, fired.append, 'b2')
+    timers.start('c', 0.01, fired.append, 'c')
+    assert timers.cancel('c') is True
+    assert len(timers) == 2
+
+    await asyncio.sleep(0.05)
+    assert fired == ['a', 'b2']
+    assert len(timers) == 0